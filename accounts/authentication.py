@@ -1,4 +1,13 @@
-from accounts.models import ListUser, Token
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from accounts import tokens
+from accounts.models import ListUser
+
+
+def user_cache_key(email):
+    return f'accounts:user:{email}'
 
 
 # Note, the book's version of PasswordlessAuthenticationBackend explicitly
@@ -26,10 +35,11 @@ class PasswordlessAuthenticationBackend:
         required credential. This represents a token (issued in the
         send_email process).
 
-        If uid doesn't match a token, it returns None.
+        If uid isn't a valid, unexpired token, it returns None. Tokens can
+        only be used once (see accounts.tokens).
 
-        If uid does match a token, it looks up the email address associated
-        with that token and checks for a User with the same email address.
+        If uid is a valid token, it takes the email address the token was
+        issued for and checks for a User with the same email address.
 
         If a matching user is found, it returns that user; if not found, it
         creates a new user, then returns that user.
@@ -49,12 +59,25 @@ class PasswordlessAuthenticationBackend:
         work in the absence of this parameter, but it definitely doesn't
         work without adding `request` in Django 2.1).
         """
-        try:
-            token = Token.objects.get(uid=uid)
-        except Token.DoesNotExist:
+        email = tokens.redeem(uid)
+        if email is None:
             return None
 
-        user, created = ListUser.objects.get_or_create(email=token.email)
+        # Most logins are by existing users, so we start with a read and
+        # only write if we have to. (We don't use get_user's cache here: a
+        # stale cached user would mean never creating the real one.) If a
+        # concurrent login for the same new email beats us to the insert,
+        # ours fails on the primary key, and we use theirs: effectively
+        # INSERT ... ON CONFLICT DO NOTHING, then SELECT.
+        # (The atomic block means the failed INSERT only rolls back its
+        # own savepoint, if we're already inside a transaction.)
+        user = ListUser.objects.filter(email=email).first()
+        if user is None:
+            try:
+                with transaction.atomic():
+                    user = ListUser.objects.create(email=email)
+            except IntegrityError:
+                user = ListUser.objects.get(email=email)
         return user
 
     def get_user(self, email):
@@ -66,9 +89,20 @@ class PasswordlessAuthenticationBackend:
         suggests that it expects None from custom backends:
         https://docs.djangoproject.com/en/2.1/ref/contrib/auth/#django.contrib.auth.get_user
         """
+        # AuthenticationMiddleware calls this on every request from a
+        # logged-in user, so we cache users for a short while (and
+        # accounts.signals drops them from the cache when they change).
+        key = user_cache_key(email)
+        user = cache.get(key)
+        if user is not None:
+            return user
+
         # Note that because get_user takes the object's pk (in this case
         # email) there can only ever be 1 or 0 matches. We can implement
         # a simple get or None behaviour by combining filter() on the pk
         # with first() (which returns None if no matches)
-        return ListUser.objects.filter(email=email).first()
+        user = ListUser.objects.filter(email=email).first()
+        if user is not None:
+            cache.set(key, user, settings.USER_CACHE_TTL)
+        return user
 
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Token
+
+
+class Command(BaseCommand):
+    """Delete expired login tokens.
+
+    Used tokens are deleted on login, but tokens that are never used would
+    otherwise stay in the table forever. Run this periodically (e.g., from
+    cron; see deploy_tools/provisioning_notes.md). It deletes in batches,
+    each its own short DELETE, so it doesn't hold a long write lock on
+    the table while logins are going on.
+    """
+    help = 'Delete expired login tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Deleted {purge_expired_tokens(options["batch_size"])} '
+            'expired tokens'
+        )
+
+
+def purge_expired_tokens(batch_size=500):
+    total = 0
+    while True:
+        batch = list(
+            Token.objects.expired().values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return total
+        deleted, _ = Token.objects.filter(pk__in=batch).delete()
+        total += deleted
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts import outbox
+
+
+class Command(BaseCommand):
+    """Send the emails queued in the outbox (see accounts.outbox).
+
+    By default this sends everything that's queued and exits. With
+    `--loop` it keeps running, checking for new email every `--interval`
+    seconds, which is how it runs as a service (see
+    deploy_tools/outbox-systemd.template.service).
+    """
+    help = 'Send queued emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='emails to send per SMTP connection')
+        parser.add_argument('--loop', action='store_true',
+                            help='keep running, polling for new email')
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = outbox.send_queued(options['batch_size'])
+            if sent:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Sent {sent} emails')
+                continue
+            # the queue is empty (or only has emails that are failing, or
+            # the mail server is down)
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+# Generated by Django 2.1.2 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='token',
+            index=models.Index(fields=['email', 'created'], name='accounts_token_email_idx'),
+        ),
+    ]
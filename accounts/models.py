@@ -1,6 +1,9 @@
 import uuid
+from datetime import timedelta
 
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class ListUser(models.Model):
@@ -40,6 +43,18 @@ class ListUser(models.Model):
     is_authenticated = True
 
 
+class TokenQuerySet(models.QuerySet):
+
+    def _cutoff(self):
+        return timezone.now() - timedelta(seconds=settings.LOGIN_TOKEN_TTL)
+
+    def unexpired(self):
+        return self.filter(created__gt=self._cutoff())
+
+    def expired(self):
+        return self.filter(created__lte=self._cutoff())
+
+
 class Token(models.Model):
     email = models.EmailField()
     """
@@ -50,9 +65,45 @@ class Token(models.Model):
     represents a hexadecimal digit
     """
     uid = models.CharField(default=uuid.uuid4,
-                           max_length=40)
+                           max_length=40,
+                           unique=True)  # (unique also gives us an index,
+                                         # for looking tokens up on login)
+    """
+    Tokens are valid for settings.LOGIN_TOKEN_TTL seconds after they're
+    created, and are deleted when they're used. Expired tokens that were
+    never used are deleted by the `purge_tokens` management command.
+    """
+    created = models.DateTimeField(default=timezone.now, db_index=True)
 
+    objects = TokenQuerySet.as_manager()
+
+    class Meta:
+        # for finding an email's recent tokens (see
+        # accounts.tokens.recently_issued)
+        indexes = [
+            models.Index(fields=['email', 'created'],
+                         name='accounts_token_email_idx'),
+        ]
 
     def __str__(self):
         return str(self.uid)
 
+
+class OutboxEmail(models.Model):
+    """An email waiting to be sent by the `send_queued_mail` worker (see
+    accounts.outbox), so that views don't have to wait on the SMTP server.
+    Emails are deleted once they have been sent.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    to = models.EmailField()
+    created = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
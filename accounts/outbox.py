@@ -0,0 +1,72 @@
+"""A durable queue for outgoing email.
+
+Sending an email inline means a request waits for the SMTP handshake
+(TLS and all), which can take seconds. Instead, views can `enqueue()` an
+email, which is a single INSERT, and a separate worker process (the
+`send_queued_mail` management command) sends the queued emails, reusing
+one SMTP connection for each batch.
+
+This assumes a single worker: two workers could send the same email.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from accounts.models import OutboxEmail
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, body, from_email, to):
+    return OutboxEmail.objects.create(subject=subject,
+                                      body=body,
+                                      from_email=from_email,
+                                      to=to)
+
+
+def send_queued(batch_size=100):
+    """Send up to `batch_size` queued emails over one SMTP connection.
+
+    Emails that are sent are deleted; those that fail are kept to be
+    retried, up to settings.OUTBOX_MAX_ATTEMPTS attempts. If we can't
+    connect to the mail server at all, nothing is sent (and no attempts
+    are counted). Returns the number of emails sent.
+    """
+    emails = list(OutboxEmail.objects.filter(
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+    )[:batch_size])
+    if not emails:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except OSError as e:  # (including smtplib.SMTPException)
+        logger.warning('Failed to connect to the mail server: %s', e)
+        return 0
+
+    sent = []
+    with connection:
+        for email in emails:
+            message = EmailMessage(email.subject,
+                                   email.body,
+                                   email.from_email,
+                                   [email.to],
+                                   connection=connection)
+            try:
+                # one message at a time (on the same connection) so that a
+                # rejected recipient doesn't fail the whole batch
+                message.send()
+            except Exception as e:
+                logger.warning('Failed to send email %s to %s: %s',
+                               email.pk, email.to, e)
+                email.attempts += 1
+                email.last_error = str(e)
+                email.save(update_fields=['attempts', 'last_error'])
+            else:
+                sent.append(email.pk)
+
+    OutboxEmail.objects.filter(pk__in=sent).delete()
+    return len(sent)
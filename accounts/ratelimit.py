@@ -0,0 +1,43 @@
+"""Token-bucket rate limiting, with the buckets kept in Django's cache.
+
+Each key (e.g., an email address or an IP) gets a bucket holding up to
+`capacity` tokens, which refills at `capacity` tokens per `period`
+seconds. Each attempt takes a token; when the bucket is empty, attempts
+are refused until it refills. So a client can make `capacity` attempts in
+a burst, and after that about `capacity` per `period`.
+
+The read-modify-write of a bucket isn't atomic, so concurrent attempts
+with the same key can occasionally both get through. That's fine for
+slowing down abuse, which is all we need this for.
+"""
+import time
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period  # tokens per second
+        self.period = period
+
+    def _key(self, key):
+        return f'ratelimit:{self.name}:{key}'
+
+    def allow(self, key):
+        """Take a token from `key`'s bucket if there is one. Returns
+        whether the attempt is allowed.
+        """
+        cache_key = self._key(key)
+        now = time.time()
+        tokens, updated = cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # an untouched bucket is full again after `period` seconds, so we
+        # don't need to keep it any longer than that
+        cache.set(cache_key, (tokens, now), timeout=self.period)
+        return allowed
@@ -0,0 +1,15 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.authentication import user_cache_key
+from accounts.models import ListUser
+
+
+@receiver(post_save, sender=ListUser)
+@receiver(post_delete, sender=ListUser)
+def forget_cached_user(sender, instance, **kwargs):
+    """Drop a changed user from PasswordlessAuthenticationBackend's cache
+    (see `get_user`).
+    """
+    cache.delete(user_cache_key(instance.pk))
@@ -1,4 +1,11 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 from accounts.authentication import PasswordlessAuthenticationBackend
@@ -62,9 +69,126 @@ class AuthenticateTest(TestCase):
         )
         self.assertEqual(user, existing_user)
 
+    def test_token_can_only_be_used_once(self):
+        token = Token.objects.create(email='alice@example.com')
+        backend = PasswordlessAuthenticationBackend()
+
+        first = backend.authenticate(request=self.request, uid=token.uid)
+        second = backend.authenticate(request=self.request, uid=token.uid)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertFalse(Token.objects.filter(uid=token.uid).exists())
+
+    @override_settings(LOGIN_TOKEN_TTL=60)
+    def test_expired_token_returns_None(self):
+        token = Token.objects.create(
+            email='alice@example.com',
+            created=timezone.now() - timedelta(seconds=61)
+        )
+
+        result = PasswordlessAuthenticationBackend().authenticate(
+            request=self.request,
+            uid=token.uid
+        )
+
+        self.assertIsNone(result)
+
+    def test_existing_user_login_does_not_write(self):
+        User.objects.create(email='alice@example.com')
+        token = Token.objects.create(email='alice@example.com')
+        cache.clear()
+        backend = PasswordlessAuthenticationBackend()
+
+        # (find the token, delete it, read the user)
+        with self.assertNumQueries(3):
+            backend.authenticate(request=self.request, uid=token.uid)
+
+    def test_uses_user_created_by_concurrent_login(self):
+        # as if another login created the user between our read and our
+        # insert
+        existing_user = User.objects.create(email='alice@example.com')
+        token = Token.objects.create(email='alice@example.com')
+
+        with patch('accounts.authentication.ListUser.objects.filter') as \
+                mock_filter:
+            mock_filter.return_value.first.return_value = None
+            user = PasswordlessAuthenticationBackend().authenticate(
+                request=self.request,
+                uid=token.uid
+            )
+
+        self.assertEqual(user, existing_user)
+        self.assertEqual(User.objects.count(), 1)
+
+
+# (TransactionTestCase, so that the threads' connections can see each
+# other's writes.) An in-memory SQLite test DB is shared between threads
+# with table-level locks, so that concurrent writers fail immediately with
+# "database table is locked" whatever our code does: run these against a
+# file-based SQLite test DB (DJANGO_TEST_DB_NAME, see DATABASES in
+# settings) or PostgreSQL.
+class ConcurrentLoginTest(TransactionTestCase):
+
+    def setUp(self):
+        # (checked here, as the test DB doesn't exist at import time)
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('needs a test DB that supports concurrent '
+                          'connections')
+
+    def login_concurrently(self, emails):
+        barrier = threading.Barrier(len(emails))
+        users = []
+        errors = []
+
+        def log_in(email):
+            try:
+                barrier.wait()
+                users.append(PasswordlessAuthenticationBackend().authenticate(
+                    request=None,
+                    uid=email
+                ))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        # (the tokens aren't what we're testing here, so every uid is
+        # valid, for the email address it is)
+        with patch('accounts.authentication.tokens.redeem',
+                   side_effect=lambda uid: uid):
+            threads = [threading.Thread(target=log_in, args=(email,))
+                       for email in emails]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return users, errors
+
+    def test_simultaneous_logins_for_the_same_new_email(self):
+        users, errors = self.login_concurrently(['alice@example.com'] * 200)
+
+        self.assertEqual(errors, [])
+        self.assertEqual({user.email for user in users},
+                         {'alice@example.com'})
+        self.assertEqual(len(users), 200)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_simultaneous_logins_for_different_new_emails(self):
+        emails = [f'user{i % 50}@example.com' for i in range(200)]
+
+        users, errors = self.login_concurrently(emails)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(users), 200)
+        self.assertEqual(User.objects.count(), 50)
+
 
 class GetUserTest(TestCase):
 
+    def setUp(self):
+        cache.clear()
+
     def test_returns_user_if_valid_email(self):
         User.objects.create(email='another@example.com')
         target_user = User.objects.create(email='alice@example.com')
@@ -83,3 +207,60 @@ class GetUserTest(TestCase):
                 'alice@example.com'
             )
         )
+
+    def test_caches_user_between_calls(self):
+        User.objects.create(email='alice@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user('alice@example.com')
+
+        with self.assertNumQueries(0):
+            user = backend.get_user('alice@example.com')
+
+        self.assertEqual(user.email, 'alice@example.com')
+
+    def test_does_not_cache_missing_users(self):
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user('alice@example.com')
+        User.objects.create(email='alice@example.com')
+
+        self.assertIsNotNone(backend.get_user('alice@example.com'))
+
+    def test_deleted_user_is_dropped_from_cache(self):
+        user = User.objects.create(email='alice@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user('alice@example.com')
+
+        user.delete()
+
+        self.assertIsNone(backend.get_user('alice@example.com'))
+
+    def test_saved_user_is_dropped_from_cache(self):
+        user = User.objects.create(email='alice@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user('alice@example.com')
+
+        user.save()
+
+        with self.assertNumQueries(1):
+            backend.get_user('alice@example.com')
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+    def test_authenticated_page_views_dont_query_the_user(self):
+        user = User.objects.create(email='alice@example.com')
+        self.client.force_login(user)
+        self.client.get('/')
+
+        # (just the session)
+        with self.assertNumQueries(1):
+            self.client.get('/')
+
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db'
+    )
+    def test_cached_db_sessions_make_page_views_query_free(self):
+        user = User.objects.create(email='alice@example.com')
+        self.client.force_login(user)
+        self.client.get('/')
+
+        with self.assertNumQueries(0):
+            self.client.get('/')
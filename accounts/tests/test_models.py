@@ -1,4 +1,8 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 # NOTE: we don't need to import accounts.models.User because, as it has
@@ -36,3 +40,24 @@ class TokenModelTest(TestCase):
         token1 = Token.objects.create(email='a@b.com')
         token2 = Token.objects.create(email='a@b.com')
         self.assertNotEqual(token1.uid, token2.uid)
+
+    def test_uid_is_unique(self):
+        token = Token.objects.create(email='a@b.com')
+        with self.assertRaises(IntegrityError):
+            Token.objects.create(email='c@d.com', uid=token.uid)
+
+    def test_records_creation_time(self):
+        before = timezone.now()
+        token = Token.objects.create(email='a@b.com')
+        self.assertGreaterEqual(token.created, before)
+
+    @override_settings(LOGIN_TOKEN_TTL=60)
+    def test_expired_and_unexpired(self):
+        fresh = Token.objects.create(email='a@b.com')
+        stale = Token.objects.create(
+            email='a@b.com',
+            created=timezone.now() - timedelta(seconds=61)
+        )
+
+        self.assertEqual(list(Token.objects.unexpired()), [fresh])
+        self.assertEqual(list(Token.objects.expired()), [stale])
@@ -0,0 +1,165 @@
+import threading
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+try:  # (asyncore and smtpd are deprecated, and gone from Python 3.12)
+    import asyncore
+    import smtpd
+except ImportError:
+    asyncore = smtpd = None
+
+from accounts import outbox
+from accounts.models import OutboxEmail
+
+
+class OutboxTest(TestCase):
+
+    def enqueue(self, to='alice@example.com'):
+        return outbox.enqueue('subject', 'body', 'from@example.com', to)
+
+    def test_enqueue_stores_email(self):
+        self.enqueue()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.subject, 'subject')
+        self.assertEqual(email.to, 'alice@example.com')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_queued_sends_and_deletes_emails(self):
+        self.enqueue('alice@example.com')
+        self.enqueue('bob@example.com')
+
+        sent = outbox.send_queued()
+
+        self.assertEqual(sent, 2)
+        self.assertEqual([m.to for m in mail.outbox],
+                         [['alice@example.com'], ['bob@example.com']])
+        self.assertEqual(OutboxEmail.objects.count(), 0)
+
+    def test_send_queued_sends_up_to_batch_size(self):
+        for _ in range(3):
+            self.enqueue()
+
+        outbox.send_queued(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_send_queued_uses_one_connection_per_batch(self):
+        for _ in range(3):
+            self.enqueue()
+
+        with patch('accounts.outbox.get_connection',
+                   wraps=outbox.get_connection) as mock_get_connection:
+            outbox.send_queued()
+
+        self.assertEqual(mock_get_connection.call_count, 1)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_emails_are_kept_for_retry_until_max_attempts(self):
+        self.enqueue()
+
+        with patch('accounts.outbox.EmailMessage.send',
+                   side_effect=OSError('connection refused')):
+            self.assertEqual(outbox.send_queued(), 0)
+            outbox.send_queued()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(email.last_error, 'connection refused')
+        outbox.send_queued()  # no more attempts
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_queued_keeps_emails_if_it_cant_connect(self):
+        self.enqueue()
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open',
+                   side_effect=ConnectionRefusedError('connection refused')):
+            self.assertEqual(outbox.send_queued(), 0)
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.attempts, 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_command_drains_queue(self):
+        for _ in range(5):
+            self.enqueue()
+
+        call_command('send_queued_mail', '--batch-size', '2')
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(OutboxEmail.objects.count(), 0)
+
+    def test_command_loop_waits_and_retries_if_it_cant_connect(self):
+        self.enqueue()
+
+        class StopLoop(Exception):
+            pass
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open',
+                   side_effect=[ConnectionRefusedError(), None, None]), \
+                patch('accounts.management.commands.send_queued_mail.time'
+                      '.sleep', side_effect=[None, StopLoop]) as mock_sleep:
+            with self.assertRaises(StopLoop):
+                call_command('send_queued_mail', '--loop')
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+
+if smtpd:
+    class RecordingSMTPServer(smtpd.SMTPServer):
+        """A local stand-in for the real SMTP server"""
+
+        def __init__(self):
+            super().__init__(('127.0.0.1', 0), None, decode_data=True)
+            self.port = self.socket.getsockname()[1]
+            self.connections = 0
+            self.recipients = []
+
+        def handle_accepted(self, conn, addr):
+            self.connections += 1
+            super().handle_accepted(conn, addr)
+
+        def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+            self.recipients.extend(rcpttos)
+
+
+@skipIf(smtpd is None, 'needs the asyncore and smtpd modules')
+class SMTPOutboxTest(TestCase):
+
+    def setUp(self):
+        self.server = RecordingSMTPServer()
+        self.thread = threading.Thread(
+            target=asyncore.loop,
+            kwargs={'timeout': 0.05, 'map': None}
+        )
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.close()
+        asyncore.close_all()
+        self.thread.join()
+
+    def test_sends_batch_over_one_smtp_connection(self):
+        for to in ('a@example.com', 'b@example.com', 'c@example.com'):
+            outbox.enqueue('subject', 'body', 'from@example.com', to)
+
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.server.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+        ):
+            sent = outbox.send_queued()
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(self.server.recipients,
+                         ['a@example.com', 'b@example.com', 'c@example.com'])
+        self.assertEqual(self.server.connections, 1)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import Token
+
+
+@override_settings(LOGIN_TOKEN_TTL=60)
+class PurgeTokensTest(TestCase):
+
+    def create_expired_tokens(self, count):
+        Token.objects.bulk_create(
+            Token(email='a@b.com',
+                  created=timezone.now() - timedelta(seconds=61))
+            for _ in range(count)
+        )
+
+    def test_deletes_only_expired_tokens(self):
+        self.create_expired_tokens(3)
+        fresh = Token.objects.create(email='a@b.com')
+        out = StringIO()
+
+        call_command('purge_tokens', stdout=out)
+
+        self.assertEqual(list(Token.objects.all()), [fresh])
+        self.assertIn('Deleted 3 expired tokens', out.getvalue())
+
+    def test_deletes_in_batches(self):
+        self.create_expired_tokens(5)
+
+        with self.assertNumQueries(7):  # 3 batches * (SELECT + DELETE)
+                                        # + the final, empty, SELECT
+            call_command('purge_tokens', '--batch-size', '2',
+                         stdout=StringIO())
+
+        self.assertEqual(Token.objects.count(), 0)
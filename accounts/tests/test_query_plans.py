@@ -0,0 +1,33 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import Token
+
+
+# (see lists.tests.test_query_plans)
+class QueryPlanTest(TestCase):
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks SQLite query plans')
+
+    def assertNoTableScan(self, queryset):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, re.compile(r'\bSCAN\b'))
+        self.assertIn('SEARCH', plan)
+
+    def test_token_by_uid(self):
+        # (as in accounts.tokens.redeem)
+        self.assertNoTableScan(Token.objects.unexpired().filter(uid='abc'))
+
+    def test_recent_tokens_by_email(self):
+        # (as in accounts.tokens.recently_issued)
+        self.assertNoTableScan(
+            Token.objects.unexpired().filter(
+                email__iexact='alice@example.com',
+                created__gt=timezone.now()
+            )
+        )
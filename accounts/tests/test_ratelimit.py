@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.ratelimit import TokenBucket
+
+
+@patch('accounts.ratelimit.time.time')
+class TokenBucketTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # 2 attempts, refilling at 2 per 10 seconds
+        self.bucket = TokenBucket('test', capacity=2, period=10)
+
+    def test_allows_burst_up_to_capacity(self, mock_time):
+        mock_time.return_value = 1000
+
+        self.assertTrue(self.bucket.allow('a'))
+        self.assertTrue(self.bucket.allow('a'))
+        self.assertFalse(self.bucket.allow('a'))
+
+    def test_refills_over_time(self, mock_time):
+        mock_time.return_value = 1000
+        self.bucket.allow('a')
+        self.bucket.allow('a')
+
+        mock_time.return_value = 1005  # one token's worth
+        self.assertTrue(self.bucket.allow('a'))
+        self.assertFalse(self.bucket.allow('a'))
+
+    def test_does_not_refill_beyond_capacity(self, mock_time):
+        mock_time.return_value = 1000
+        self.bucket.allow('a')
+
+        mock_time.return_value = 2000
+        results = [self.bucket.allow('a') for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+
+    def test_buckets_are_per_key(self, mock_time):
+        mock_time.return_value = 1000
+        self.bucket.allow('a')
+        self.bucket.allow('a')
+
+        self.assertTrue(self.bucket.allow('b'))
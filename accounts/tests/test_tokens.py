@@ -0,0 +1,128 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from accounts import tokens
+from accounts.authentication import PasswordlessAuthenticationBackend
+from accounts.models import Token
+
+
+User = get_user_model()
+
+
+class DBTokensTest(TestCase):
+
+    def test_issue_creates_token(self):
+        uid = tokens.issue('alice@example.com')
+        self.assertEqual(Token.objects.get(uid=uid).email, 'alice@example.com')
+
+    def test_redeem_returns_email_once(self):
+        uid = tokens.issue('alice@example.com')
+        self.assertEqual(tokens.redeem(uid), 'alice@example.com')
+        self.assertIsNone(tokens.redeem(uid))
+
+    def test_redeem_None(self):
+        self.assertIsNone(tokens.redeem(None))
+
+    def test_recently_issued_ignores_case(self):
+        self.assertFalse(tokens.recently_issued('alice@example.com'))
+        tokens.issue('Alice@example.com')
+        self.assertTrue(tokens.recently_issued('alice@example.com'))
+        self.assertTrue(tokens.recently_issued('ALICE@example.com'))
+        self.assertFalse(tokens.recently_issued('bob@example.com'))
+
+    def test_redeemed_token_is_no_longer_recent(self):
+        uid = tokens.issue('alice@example.com')
+        tokens.redeem(uid)
+        self.assertFalse(tokens.recently_issued('alice@example.com'))
+
+    def test_login_keeps_the_address_as_typed(self):
+        # (it's the user's primary key: see PasswordlessAuthenticationBackend)
+        User.objects.create(email='Alice@Example.com')
+        uid = tokens.issue('Alice@Example.com')
+        user = PasswordlessAuthenticationBackend().authenticate(
+            request=None,
+            uid=uid
+        )
+        self.assertEqual(user.email, 'Alice@Example.com')
+        self.assertEqual(User.objects.count(), 1)
+
+
+@override_settings(LOGIN_TOKEN_MODE='signed')
+class SignedTokensTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_issue_does_not_touch_the_db(self):
+        with self.assertNumQueries(0):
+            uid = tokens.issue('alice@example.com')
+        self.assertFalse(Token.objects.exists())
+
+    def test_redeem_returns_email_without_touching_the_db(self):
+        uid = tokens.issue('alice@example.com')
+        with self.assertNumQueries(0):
+            self.assertEqual(tokens.redeem(uid), 'alice@example.com')
+
+    def test_token_can_only_be_used_once(self):
+        uid = tokens.issue('alice@example.com')
+        self.assertEqual(tokens.redeem(uid), 'alice@example.com')
+        self.assertIsNone(tokens.redeem(uid))
+
+    def test_tampered_token_is_rejected(self):
+        payload, timestamp, signature = tokens.issue(
+            'alice@example.com'
+        ).split(':')
+        forged_payload = signing.b64_encode(b'"mallory@example.com"')
+        forged = ':'.join([forged_payload.decode(), timestamp, signature])
+        self.assertIsNone(tokens.redeem(forged))
+        self.assertIsNone(tokens.redeem('no-such-token'))
+
+    def test_token_signed_for_something_else_is_rejected(self):
+        uid = signing.dumps('alice@example.com', salt='something.else')
+        self.assertIsNone(tokens.redeem(uid))
+
+    @override_settings(LOGIN_TOKEN_TTL=60)
+    def test_expired_token_is_rejected(self):
+        uid = tokens.issue('alice@example.com')
+        with patch('django.core.signing.time.time',
+                   return_value=time.time() + 61):
+            self.assertIsNone(tokens.redeem(uid))
+
+    def test_recently_issued(self):
+        self.assertFalse(tokens.recently_issued('alice@example.com'))
+        tokens.issue('alice@example.com')
+        self.assertTrue(tokens.recently_issued('alice@example.com'))
+        self.assertTrue(tokens.recently_issued('ALICE@example.com'))
+        self.assertFalse(tokens.recently_issued('bob@example.com'))
+
+    def test_redeemed_token_is_no_longer_recent(self):
+        uid = tokens.issue('Alice@example.com')
+        tokens.redeem(uid)
+        self.assertFalse(tokens.recently_issued('alice@example.com'))
+
+    def test_authenticate_with_signed_token(self):
+        uid = tokens.issue('alice@example.com')
+        user = PasswordlessAuthenticationBackend().authenticate(
+            request=None,
+            uid=uid
+        )
+        self.assertEqual(user.email, 'alice@example.com')
+
+    @patch('accounts.views.send_mail')
+    def test_login_link_round_trip(self, mock_send_mail):
+        self.client.post('/accounts/send_login_email', data={
+            'email': 'alice@example.com'
+        })
+        self.assertFalse(Token.objects.exists())
+        (subject, body, from_email, to_list), kwargs = mock_send_mail.call_args
+        url = body.split()[-1]
+
+        self.client.get(url)
+
+        response = self.client.get('/')
+        self.assertContains(response, 'Logged in as alice@example.com')
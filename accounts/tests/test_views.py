@@ -1,13 +1,19 @@
 from unittest.mock import patch, call
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 import accounts.views
-from accounts.models import Token
+from accounts.models import OutboxEmail, Token
+from superlists.metrics import registry
 
 
 class SendLoginEmailViewTest(TestCase):
 
+    def setUp(self):
+        cache.clear()  # (where the rate limits are kept)
+        registry.reset()
+
     def test_redirects_to_home_page(self):
         response = self.client.post(
             '/accounts/send_login_email',
@@ -78,6 +84,103 @@ class SendLoginEmailViewTest(TestCase):
         token = Token.objects.first()
         self.assertEqual(token.email, 'alice@example.com')
 
+    @override_settings(LOGIN_EMAIL_QUEUED=True)
+    @patch('accounts.views.send_mail')
+    def test_queues_email_instead_of_sending_if_queued(self, mock_send_mail):
+        self.client.post('/accounts/send_login_email', data={
+            'email': 'alice@example.com'
+        })
+
+        self.assertFalse(mock_send_mail.called)
+        email = OutboxEmail.objects.get()
+        token = Token.objects.get()
+        self.assertEqual(email.to, 'alice@example.com')
+        self.assertEqual(email.subject, 'Your login link for Superlists')
+        self.assertIn(f'/accounts/login?token={token.uid}', email.body)
+
+    @patch('accounts.views.send_mail')
+    def test_reuses_recent_token_instead_of_sending_another(
+        self, mock_send_mail
+    ):
+        for _ in range(2):
+            response = self.client.post('/accounts/send_login_email', data={
+                'email': 'alice@example.com'
+            }, follow=True)
+
+        self.assertEqual(Token.objects.count(), 1)
+        self.assertEqual(mock_send_mail.call_count, 1)
+        message = list(response.context['messages'])[0]
+        self.assertEqual(message.tags, 'success')
+        self.assertEqual(registry.events()['login_email_deduplicated'], 1)
+
+    @override_settings(LOGIN_TOKEN_REUSE_WINDOW=0)
+    @patch('accounts.views.send_mail')
+    def test_sends_new_token_once_reuse_window_has_passed(
+        self, mock_send_mail
+    ):
+        for _ in range(2):
+            self.client.post('/accounts/send_login_email', data={
+                'email': 'alice@example.com'
+            })
+
+        self.assertEqual(Token.objects.count(), 2)
+        self.assertEqual(mock_send_mail.call_count, 2)
+
+    @override_settings(LOGIN_EMAIL_RATE_LIMITS={'email': (2, 60),
+                                                'ip': (100, 60)},
+                       LOGIN_TOKEN_REUSE_WINDOW=0)
+    @patch('accounts.views.send_mail')
+    def test_rate_limits_requests_per_email(self, mock_send_mail):
+        for _ in range(3):
+            response = self.client.post('/accounts/send_login_email', data={
+                'email': 'alice@example.com'
+            }, follow=True)
+        self.client.post('/accounts/send_login_email', data={
+            'email': 'bob@example.com'
+        })
+
+        self.assertEqual(mock_send_mail.call_count, 3)  # 2 alice, 1 bob
+        message = list(response.context['messages'])[0]
+        self.assertEqual(message.message,
+                         'Too many login requests, please try again later.')
+        self.assertEqual(message.tags, 'warning')
+        self.assertEqual(
+            registry.events()['login_email_rate_limited_email'], 1
+        )
+
+    @override_settings(LOGIN_EMAIL_RATE_LIMITS={'email': (100, 60),
+                                                'ip': (2, 60)})
+    @patch('accounts.views.send_mail')
+    def test_rate_limits_requests_per_ip(self, mock_send_mail):
+        for i in range(3):
+            self.client.post('/accounts/send_login_email',
+                             data={'email': f'user{i}@example.com'},
+                             REMOTE_ADDR='10.0.0.1')
+        self.client.post('/accounts/send_login_email',
+                         data={'email': 'other@example.com'},
+                         REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(mock_send_mail.call_count, 3)
+        self.assertEqual(registry.events()['login_email_rate_limited_ip'], 1)
+
+    @override_settings(LOGIN_EMAIL_RATE_LIMITS={'email': (100, 60),
+                                                'ip': (1, 60)})
+    @patch('accounts.views.send_mail')
+    def test_uses_forwarded_client_ip_behind_proxy(self, mock_send_mail):
+        for i in range(2):
+            self.client.post('/accounts/send_login_email',
+                             data={'email': f'user{i}@example.com'},
+                             HTTP_X_REAL_IP=f'10.0.0.{i}')
+
+        self.assertEqual(mock_send_mail.call_count, 2)
+
+    @patch('accounts.views.send_mail')
+    def test_counts_sent_emails(self, mock_send_mail):
+        self.client.post('/accounts/send_login_email', data={
+            'email': 'alice@example.com'
+        })
+        self.assertEqual(registry.events()['login_email_sent'], 1)
+
 
 # We can use patch to apply a mock to an individual test (like we do
 # with `test_POST_sends_link_to_login_using_token_uid`) or to a whole
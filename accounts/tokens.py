@@ -0,0 +1,116 @@
+"""Login tokens: the `uid` in a login link, and what it's worth.
+
+There are two ways of doing this, chosen by settings.LOGIN_TOKEN_MODE:
+
+- 'db': the uid is a random `Token.uid`, stored in the DB along with the
+  email address it was sent to. Logging in looks the token up and deletes
+  it.
+- 'signed': the uid *is* the email address, plus a timestamp, signed with
+  SECRET_KEY (see django.core.signing). Logging in just checks the
+  signature and the age, so there's no token table to write to, look up
+  in, or purge. As nothing is deleted when a signed token is used, we
+  remember used tokens in the cache (until they'd have expired anyway) so
+  that each can still only be used once.
+
+Note that in 'signed' mode the replay protection, and the "recently sent"
+marks that stop us sending duplicate emails, live in Django's cache: when
+running several server processes use a shared backend (see CACHES in
+settings), or else a used link could be used again with another process.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from accounts.models import Token
+
+
+SALT = 'accounts.tokens.login'
+
+
+def _signed_mode():
+    return settings.LOGIN_TOKEN_MODE == 'signed'
+
+
+def _cache_key(kind, value):
+    # (hashed, as cache keys have a length limit with some backends)
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    return f'accounts:{kind}:{digest}'
+
+
+def make_signed_token(email):
+    return signing.dumps(email, salt=SALT)
+
+
+def read_signed_token(uid):
+    """Return the email address signed into `uid`, or None if `uid` is
+    not a valid, unexpired, signed token.
+    """
+    try:
+        return signing.loads(uid, salt=SALT, max_age=settings.LOGIN_TOKEN_TTL)
+    except signing.BadSignature:  # (includes SignatureExpired)
+        return None
+
+
+def issue(email):
+    """Return a new login token uid for `email`."""
+    if _signed_mode():
+        cache.set(_cache_key('login_email_sent', email.lower()),
+                  True,
+                  settings.LOGIN_TOKEN_REUSE_WINDOW)
+        return make_signed_token(email)
+    return str(Token.objects.create(email=email))
+
+
+def recently_issued(email):
+    """Whether we issued a login token for `email` in the last
+    LOGIN_TOKEN_REUSE_WINDOW seconds (and, in 'db' mode, it's unused).
+    """
+    if _signed_mode():
+        return cache.get(_cache_key('login_email_sent', email.lower()),
+                         False)
+    window = timedelta(seconds=settings.LOGIN_TOKEN_REUSE_WINDOW)
+    # The address is matched ignoring case, like the cache keys above,
+    # but the token keeps it as typed: it's who the user logs in as. (The
+    # `created` index narrows this down to the last few seconds' tokens,
+    # so the case-insensitive match doesn't need an index of its own.)
+    return Token.objects.unexpired().filter(
+        email__iexact=email,
+        created__gt=timezone.now() - window
+    ).exists()
+
+
+def redeem(uid):
+    """Use up the login token `uid`, returning the email address it was
+    issued for, or None if it's invalid, expired or already used.
+    """
+    if uid is None:
+        return None
+
+    if _signed_mode():
+        email = read_signed_token(uid)
+        if email is None:
+            return None
+        # `add` only succeeds if the key isn't there yet, so of two
+        # requests racing to use the same token only one gets in.
+        if not cache.add(_cache_key('login_token_used', uid),
+                         True,
+                         settings.LOGIN_TOKEN_TTL):
+            return None
+        # (as in 'db' mode, where the used token no longer counts, a new
+        # link can be sent straight away)
+        cache.delete(_cache_key('login_email_sent', email.lower()))
+        return email
+
+    token = Token.objects.unexpired().filter(uid=uid).first()
+    if token is None:
+        return None
+    # If two requests race to use the same token, only one of them
+    # gets to delete it (and so to log in).
+    deleted, _ = Token.objects.filter(pk=token.pk).delete()
+    if not deleted:
+        return None
+    return token.email
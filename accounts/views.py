@@ -1,29 +1,69 @@
+from django.conf import settings
 from django.core.mail import send_mail
 from django.shortcuts import redirect
 from django.contrib import messages, auth
 from django.urls import reverse
+from django.utils.http import urlencode
 
-from accounts.models import Token
+from accounts import outbox, tokens
+from accounts.ratelimit import TokenBucket
+from superlists.metrics import registry
+
+
+SUCCESS_MESSAGE = "Check your email, we've sent you a link you can use to log in."
+RATE_LIMITED_MESSAGE = "Too many login requests, please try again later."
+
+
+def _client_ip(request):
+    # behind nginx, REMOTE_ADDR is nginx's address, and it passes the
+    # client's on in X-Real-IP (see nginx.template.conf)
+    return (request.META.get('HTTP_X_REAL_IP')
+            or request.META.get('REMOTE_ADDR', ''))
+
+
+def _is_rate_limited(request, email):
+    for name, key in (('ip', _client_ip(request)), ('email', email.lower())):
+        capacity, period = settings.LOGIN_EMAIL_RATE_LIMITS[name]
+        bucket = TokenBucket(f'login_email:{name}', capacity, period)
+        if not bucket.allow(key):
+            registry.increment(f'login_email_rate_limited_{name}')
+            return True
+    return False
 
 
 def send_login_email(request):
     email = request.POST['email']
-    token = Token.objects.create(email=email)
+    if _is_rate_limited(request, email):
+        messages.warning(request, RATE_LIMITED_MESSAGE)
+        return redirect('/')
+
+    # If we've only just sent this address a (still unused) link, then
+    # rather than mint and send another, we let them use that one.
+    if tokens.recently_issued(email):
+        registry.increment('login_email_deduplicated')
+        messages.success(request, SUCCESS_MESSAGE)
+        return redirect('/')
+
+    token = tokens.issue(email)
     url = request.build_absolute_uri(
-        reverse('login') + '?token=' + str(token)
+        reverse('login') + '?' + urlencode({'token': token})
     )
     message_body = f'Use this link to log in:\n\n{url}'
 
-
-    send_mail(
-        'Your login link for Superlists',
-        message_body,
-        'noreply@superlists.com',
-        [email])
-    messages.success(
-        request,
-        "Check your email, we've sent you a link you can use to log in."
-    )
+    if settings.LOGIN_EMAIL_QUEUED:
+        outbox.enqueue(
+            'Your login link for Superlists',
+            message_body,
+            'noreply@superlists.com',
+            email)
+    else:
+        send_mail(
+            'Your login link for Superlists',
+            message_body,
+            'noreply@superlists.com',
+            [email])
+    registry.increment('login_email_sent')
+    messages.success(request, SUCCESS_MESSAGE)
     return redirect('/')
 
 def login(request):
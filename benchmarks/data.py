@@ -0,0 +1,57 @@
+"""Synthetic data for the benchmarks."""
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+from accounts.models import Token
+from accounts.tokens import make_signed_token
+from lists.models import List
+
+
+class BenchmarkData:
+    """What the scenarios need to know about the generated data."""
+
+    def __init__(self, emails, list_ids, tokens):
+        self.emails = emails
+        self.list_ids = list_ids
+        # unused login token uids, handed out one per `login` request
+        self.tokens = tokens
+
+    def random_email(self):
+        return random.choice(self.emails)
+
+    def random_list_id(self):
+        return random.choice(self.list_ids)
+
+
+def generate(users=10, lists_per_user=10, items_per_list=10,
+             sharees_per_list=2, tokens=1000):
+    """Create `users` users, each owning `lists_per_user` lists of
+    `items_per_list` items, shared with `sharees_per_list` of the other
+    users, plus `tokens` login tokens.
+    """
+    emails = [f'user{i}@example.com' for i in range(users)]
+    User.objects.bulk_create(User(email=email) for email in emails)
+
+    list_ids = []
+    for user_index, email in enumerate(emails):
+        for list_index in range(lists_per_user):
+            list_ = List.objects.create(owner_id=email)
+            list_.add_items(f'item {i} of list {list_index} for {email}'
+                            for i in range(items_per_list))
+            for offset in range(1, min(sharees_per_list, users - 1) + 1):
+                list_.share(emails[(user_index + offset) % users])
+            list_ids.append(list_.id)
+
+    if settings.LOGIN_TOKEN_MODE == 'signed':
+        token_uids = [make_signed_token(random.choice(emails))
+                      for _ in range(tokens)]
+    else:
+        Token.objects.bulk_create(
+            Token(email=random.choice(emails)) for _ in range(tokens)
+        )
+        token_uids = list(Token.objects.values_list('uid', flat=True))
+
+    return BenchmarkData(emails, list_ids, token_uids)
@@ -0,0 +1,109 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings,
+                               setup_test_environment,
+                               teardown_test_environment)
+
+from benchmarks import data, runner
+
+
+class Command(BaseCommand):
+    """Benchmark the site's views against generated data.
+
+    This runs against a freshly-created test database (the same kind
+    `manage.py test` uses), which is destroyed afterwards, so it's safe to
+    run anywhere. Set up the environment (e.g., the database settings) to
+    match what you want to measure: for instance, run it once as is and
+    once with DJANGO_DB_ENGINE=postgresql (see DATABASES in settings) to
+    compare SQLite with PostgreSQL. The report's `meta` records which
+    database it ran against.
+
+    With `--concurrency` above 1 the client threads each need their own
+    connection to the same database, which an in-memory SQLite test DB
+    can't give them (their writes would fail on locks, and the failures
+    would skew the timings): set DJANGO_TEST_DB_NAME to use a file-based
+    one, or use PostgreSQL.
+
+    The report is JSON with stable keys, so reports from two commits can
+    be compared with `diff`. Likewise for two session engines: e.g.,
+    compare the `logged_in_home_page` queries for `--session-mode db` and
+    `--session-mode cached_db`.
+    """
+    help = 'Benchmark the site views and write a JSON report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--lists-per-user', type=int, default=10)
+        parser.add_argument('--items-per-list', type=int, default=10)
+        parser.add_argument('--sharees-per-list', type=int, default=2)
+        parser.add_argument('--requests', type=int, default=100,
+                            help='requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='number of client threads')
+        parser.add_argument('--scenario', action='append',
+                            choices=sorted(runner.SCENARIOS),
+                            dest='scenarios',
+                            help='scenario to run (repeatable; default all)')
+        parser.add_argument('--session-mode',
+                            choices=sorted(settings.SESSION_ENGINES),
+                            help='session engine to use (default: as in '
+                                 'settings)')
+        parser.add_argument('--output', '-o',
+                            help='file to write the report to '
+                                 '(default stdout)')
+
+    def handle(self, *args, **options):
+        for option in ('users', 'requests', 'concurrency'):
+            if options[option] < 1:
+                raise CommandError(f'--{option} must be at least 1')
+        parameters = {
+            key: options[key]
+            for key in ('users', 'lists_per_user', 'items_per_list',
+                        'sharees_per_list', 'requests', 'concurrency',
+                        'session_mode')
+        }
+
+        session_engine = settings.SESSION_ENGINE
+        if options['session_mode']:
+            session_engine = settings.SESSION_ENGINES[options['session_mode']]
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if (options['concurrency'] > 1 and connection.vendor == 'sqlite'
+                    and connection.is_in_memory_db()):
+                raise CommandError(
+                    '--concurrency above 1 needs a file-based SQLite test '
+                    'DB: set DJANGO_TEST_DB_NAME (see DATABASES in '
+                    'settings)'
+                )
+            benchmark_data = data.generate(
+                users=options['users'],
+                lists_per_user=options['lists_per_user'],
+                items_per_list=options['items_per_list'],
+                sharees_per_list=options['sharees_per_list'],
+                # every `login` request uses up a token
+                tokens=options['requests'],
+            )
+            with override_settings(SESSION_ENGINE=session_engine):
+                report = runner.run_benchmark(
+                    benchmark_data,
+                    scenarios=options['scenarios'],
+                    requests=options['requests'],
+                    concurrency=options['concurrency'],
+                    parameters=parameters,
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
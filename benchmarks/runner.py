@@ -0,0 +1,205 @@
+"""Drive the site's views in-process and measure them.
+
+Requests go through the Django test client, i.e., the full middleware and
+URL resolution stack but no network or WSGI server, so the numbers are
+the cost of our code and the DB. Each worker thread has its own client
+(and, as Django connections are per-thread, its own DB connection).
+"""
+import itertools
+import platform
+import subprocess
+import threading
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+_counter = itertools.count()
+
+
+def _unique():
+    # (itertools.count is thread-safe under the GIL)
+    return next(_counter)
+
+
+def _home_page(client, data):
+    return client.get('/')
+
+
+def _logged_in_home_page(client, data):
+    # Each client logs in once, with its own session; after that every
+    # request loads the session and the user, so the query count shows
+    # what the session engine (see SESSION_ENGINE in settings) costs.
+    if not getattr(client, 'benchmark_logged_in', False):
+        User = get_user_model()
+        client.force_login(User.objects.get(email=data.random_email()))
+        client.benchmark_logged_in = True
+    return client.get('/')
+
+
+def _new_list(client, data):
+    return client.post('/lists/new', data={'text': f'new list {_unique()}'})
+
+
+def _view_list(client, data):
+    return client.get(f'/lists/{data.random_list_id()}/')
+
+
+def _add_item(client, data):
+    return client.post(f'/lists/{data.random_list_id()}/',
+                       data={'text': f'new item {_unique()}'})
+
+
+def _share_list(client, data):
+    return client.post(f'/lists/{data.random_list_id()}/share',
+                       data={'sharee': f'sharee{_unique()}@example.com'})
+
+
+def _my_lists(client, data):
+    return client.get(f'/lists/users/{data.random_email()}/')
+
+
+def _send_login_email(client, data):
+    return client.post('/accounts/send_login_email',
+                       data={'email': data.random_email()})
+
+
+def _login(client, data):
+    try:
+        uid = data.tokens.pop()
+    except IndexError:
+        uid = 'no-such-token'
+    return client.get(f'/accounts/login?token={uid}')
+
+
+SCENARIOS = {
+    'home_page': _home_page,
+    'logged_in_home_page': _logged_in_home_page,
+    'new_list': _new_list,
+    'view_list': _view_list,
+    'add_item': _add_item,
+    'share_list': _share_list,
+    'my_lists': _my_lists,
+    'send_login_email': _send_login_email,
+    'login': _login,
+}
+
+
+def percentile(sorted_values, percent):
+    """The nearest-rank percentile of a sorted, non-empty list."""
+    rank = max(int(round(percent / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(name, data, requests=100, concurrency=1):
+    """Make `requests` requests of scenario `name`, spread over
+    `concurrency` threads, and return a summary of the results.
+    """
+    scenario = SCENARIOS[name]
+    latencies = []
+    query_counts = []
+    errors = []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        client = Client()
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                start = time.perf_counter()
+                try:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = scenario(client, data)
+                    failed = response.status_code >= 400
+                except Exception:
+                    failed = True
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    query_counts.append(len(queries))
+                    if failed:
+                        errors.append(name)
+        finally:
+            # the main thread's connection is left alone (and, for an
+            # in-memory test DB, keeps the DB alive)
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        worker()
+    else:
+        threads = [threading.Thread(target=worker)
+                   for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall_time = time.perf_counter() - start
+
+    latencies.sort()
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / wall_time, 1),
+        'latency_ms': {
+            'mean': round(sum(milliseconds) / len(milliseconds), 3),
+            'p50': round(percentile(milliseconds, 50), 3),
+            'p95': round(percentile(milliseconds, 95), 3),
+            'p99': round(percentile(milliseconds, 99), 3),
+            'max': round(milliseconds[-1], 3),
+        },
+        'queries': {
+            'mean': round(sum(query_counts) / len(query_counts), 2),
+            'max': max(query_counts),
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(data, scenarios=None, requests=100, concurrency=1,
+                  parameters=None):
+    """Run each of `scenarios` (by default, all of them) against `data`
+    and return a report that can be saved as JSON and diffed with the
+    report from another commit.
+    """
+    # a few requests to warm up (e.g., import and template loading) so
+    # that they don't skew the first scenario
+    warm_up_client = Client()
+    for _ in range(3):
+        _home_page(warm_up_client, data)
+
+    results = {}
+    for name in scenarios or SCENARIOS:
+        results[name] = run_scenario(name, data, requests, concurrency)
+
+    return {
+        'meta': {
+            'git_commit': _git_commit(),
+            'database': connection.vendor,
+            'session_engine': settings.SESSION_ENGINE,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'parameters': parameters or {},
+        },
+        'scenarios': results,
+    }
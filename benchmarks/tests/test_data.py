@@ -0,0 +1,30 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+from accounts.models import Token
+from benchmarks import data
+from lists.models import Item, List, ListSharee
+
+
+class GenerateTest(TestCase):
+
+    def test_creates_requested_amounts_of_data(self):
+        benchmark_data = data.generate(users=3, lists_per_user=2,
+                                       items_per_list=4, sharees_per_list=1,
+                                       tokens=5)
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(List.objects.count(), 6)
+        self.assertEqual(Item.objects.count(), 24)
+        self.assertEqual(ListSharee.objects.count(), 6)
+        self.assertEqual(Token.objects.count(), 5)
+        self.assertEqual(len(benchmark_data.list_ids), 6)
+        self.assertEqual(len(benchmark_data.tokens), 5)
+
+    def test_lists_are_shared_with_other_users(self):
+        data.generate(users=2, lists_per_user=1, items_per_list=1,
+                      sharees_per_list=5, tokens=0)
+
+        for sharee in ListSharee.objects.select_related('todolist'):
+            self.assertNotEqual(sharee.email, sharee.todolist.owner_id)
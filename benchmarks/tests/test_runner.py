@@ -0,0 +1,166 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from benchmarks import data, runner
+
+
+class PercentileTest(TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(runner.percentile(values, 50), 50)
+        self.assertEqual(runner.percentile(values, 95), 95)
+        self.assertEqual(runner.percentile(values, 99), 99)
+
+    def test_single_value(self):
+        self.assertEqual(runner.percentile([7], 99), 7)
+
+
+class RunScenarioTest(TestCase):
+
+    def setUp(self):
+        self.data = data.generate(users=2, lists_per_user=2,
+                                  items_per_list=2, tokens=5)
+
+    def test_summarises_requests(self):
+        result = runner.run_scenario('view_list', self.data, requests=5)
+
+        self.assertEqual(result['requests'], 5)
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['queries']['max'], 0)
+        latency = result['latency_ms']
+        self.assertLessEqual(latency['p50'], latency['p95'])
+        self.assertLessEqual(latency['p95'], latency['p99'])
+        self.assertLessEqual(latency['p99'], latency['max'])
+
+    def test_every_scenario_runs_without_errors(self):
+        for name in runner.SCENARIOS:
+            result = runner.run_scenario(name, self.data, requests=2)
+            self.assertEqual(result['errors'], 0, name)
+
+    def test_logged_in_queries_depend_on_session_engine(self):
+        cache.clear()
+        with override_settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            db = runner.run_scenario('logged_in_home_page', self.data,
+                                     requests=3)
+        cache.clear()
+        with override_settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            signed = runner.run_scenario('logged_in_home_page', self.data,
+                                         requests=3)
+
+        self.assertEqual(db['errors'], 0)
+        self.assertEqual(signed['errors'], 0)
+        # (the first request includes logging in)
+        self.assertGreater(db['queries']['mean'], signed['queries']['mean'])
+
+    def test_counts_error_responses(self):
+        self.data.emails = ['no-such-user@example.com']
+        result = runner.run_scenario('my_lists', self.data, requests=3)
+        self.assertEqual(result['errors'], 3)
+
+    def test_runs_with_concurrent_clients(self):
+        # (home_page doesn't touch the DB, which the other threads couldn't
+        # see inside this test's transaction)
+        result = runner.run_scenario('home_page', self.data, requests=10,
+                                     concurrency=3)
+
+        self.assertEqual(result['requests'], 10)
+        self.assertEqual(result['concurrency'], 3)
+
+
+class RunBenchmarkTest(TestCase):
+
+    def test_report_is_json_with_meta_and_scenarios(self):
+        benchmark_data = data.generate(users=1, lists_per_user=1,
+                                       items_per_list=1, tokens=0)
+
+        report = runner.run_benchmark(benchmark_data,
+                                      scenarios=['home_page', 'my_lists'],
+                                      requests=2,
+                                      parameters={'users': 1})
+
+        self.assertEqual(set(report['scenarios']), {'home_page', 'my_lists'})
+        self.assertEqual(report['meta']['database'], connection.vendor)
+        self.assertIn('session_engine', report['meta'])
+        self.assertEqual(report['meta']['parameters'], {'users': 1})
+        json.dumps(report)  # should not raise
+
+
+class BenchmarkCommandTest(TestCase):
+
+    @patch('benchmarks.management.commands.benchmark.connection')
+    @patch('benchmarks.management.commands.benchmark.runner.run_benchmark')
+    @patch('benchmarks.management.commands.benchmark.data.generate')
+    def test_runs_against_test_db_and_writes_report(
+        self, mock_generate, mock_run_benchmark, mock_connection
+    ):
+        mock_run_benchmark.return_value = {'scenarios': {}}
+
+        with patch('benchmarks.management.commands.benchmark'
+                   '.setup_test_environment'), \
+             patch('benchmarks.management.commands.benchmark'
+                   '.teardown_test_environment'):
+            call_command('benchmark', '--requests', '7',
+                         '--scenario', 'home_page', stdout=StringIO())
+
+        self.assertTrue(mock_connection.creation.create_test_db.called)
+        self.assertTrue(mock_connection.creation.destroy_test_db.called)
+        self.assertEqual(mock_generate.call_args[1]['tokens'], 7)
+        kwargs = mock_run_benchmark.call_args[1]
+        self.assertEqual(kwargs['requests'], 7)
+        self.assertEqual(kwargs['scenarios'], ['home_page'])
+
+    @patch('benchmarks.management.commands.benchmark.connection')
+    @patch('benchmarks.management.commands.benchmark.runner.run_benchmark')
+    @patch('benchmarks.management.commands.benchmark.data.generate')
+    def test_session_mode_overrides_session_engine(
+        self, mock_generate, mock_run_benchmark, mock_connection
+    ):
+        from django.conf import settings
+        engines = []
+        def run_benchmark(*args, **kwargs):
+            engines.append(settings.SESSION_ENGINE)
+            return {'scenarios': {}}
+        mock_run_benchmark.side_effect = run_benchmark
+
+        with patch('benchmarks.management.commands.benchmark'
+                   '.setup_test_environment'), \
+             patch('benchmarks.management.commands.benchmark'
+                   '.teardown_test_environment'):
+            call_command('benchmark', '--session-mode', 'signed_cookies',
+                         stdout=StringIO())
+
+        self.assertEqual(engines,
+                         ['django.contrib.sessions.backends.signed_cookies'])
+
+    def test_rejects_counts_below_one(self):
+        for option in ('--users', '--requests', '--concurrency'):
+            with self.assertRaisesRegex(CommandError, option):
+                call_command('benchmark', option, '0', stdout=StringIO())
+
+    @patch('benchmarks.management.commands.benchmark.connection')
+    @patch('benchmarks.management.commands.benchmark.runner.run_benchmark')
+    def test_concurrency_needs_a_file_based_sqlite_db(
+        self, mock_run_benchmark, mock_connection
+    ):
+        mock_connection.vendor = 'sqlite'
+        mock_connection.is_in_memory_db.return_value = True
+
+        with patch('benchmarks.management.commands.benchmark'
+                   '.setup_test_environment'), \
+             patch('benchmarks.management.commands.benchmark'
+                   '.teardown_test_environment'):
+            with self.assertRaisesRegex(CommandError, 'DJANGO_TEST_DB_NAME'):
+                call_command('benchmark', '--concurrency', '4',
+                             stdout=StringIO())
+
+        self.assertFalse(mock_run_benchmark.called)
+        self.assertTrue(mock_connection.creation.destroy_test_db.called)
@@ -1,9 +1,10 @@
+from importlib import import_module
+
 from django.conf import settings
 from django.contrib.auth import (BACKEND_SESSION_KEY,
                                  SESSION_KEY,
                                  get_user_model)
 User = get_user_model()
-from django.contrib.sessions.backends.db import SessionStore
 from django.core.management.base import BaseCommand
 
 
@@ -24,9 +25,9 @@ def create_pre_authenticated_session(email):
     # first, create a user
     user = User.objects.create(email=email)
 
-    # second, create a session object in the database (by default, Django
-    # stores its sessions in the DB). The session's SESSION_KEY is the
-    # user object's pk (in this case email).
+    # second, create a session object using whichever session engine we
+    # are configured for (see SESSION_ENGINE in settings). The session's
+    # SESSION_KEY is the user object's pk (in this case email).
     # The session also stores information to lookup which authentication
     # backend was used to authenticate the user. Hence the 
     # BACKEND_SESSION_KEY
@@ -34,6 +35,10 @@ def create_pre_authenticated_session(email):
     # check the following gist:
     # https://gist.github.com/dbrgn/bae5329e17d2801a041e
     # )
+    # (For the signed_cookies engine there's nothing stored server-side:
+    # after `save()` the session key *is* the signed session data, which
+    # is exactly what the browser needs as its cookie.)
+    SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
     session = SessionStore()
     session[SESSION_KEY] = user.pk
     session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from .management.commands.create_session import (
+    create_pre_authenticated_session
+)
+
+
+# (not a browser test: this checks the helper the FTs use to log in works
+# with each of the session engines we can be configured for)
+class CreatePreAuthenticatedSessionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_session_logs_user_in_with_every_session_engine(self):
+        for mode, engine in settings.SESSION_ENGINES.items():
+            with self.subTest(mode=mode), \
+                 override_settings(SESSION_ENGINE=engine):
+                email = f'{mode}@example.com'
+                session_key = create_pre_authenticated_session(email)
+
+                # (a new client, as the session middleware picks its
+                # engine when it's loaded)
+                client = Client()
+                client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+                response = client.get('/')
+
+                self.assertContains(response, f'Logged in as {email}')
@@ -0,0 +1,10 @@
+from django.urls import re_path
+from . import views
+
+# Note that with our URLs we are using the following convention:
+# - urls that modify the database ('action' urls): no trailing slash
+# - urls that do not modify the DB: trailing slash
+urlpatterns = [
+    re_path(r'^lists/(\d+)/$', views.list_detail, name='api_list_detail'),
+    re_path(r'^lists/(\d+)/items$', views.add_items, name='api_add_items'),
+]
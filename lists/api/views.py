@@ -0,0 +1,82 @@
+"""A JSON API for lists and their items.
+
+This is aimed at scripts (e.g., importers) rather than browsers, so the
+views are exempt from CSRF protection, the same as any other endpoint
+meant to be called without first loading one of our pages.
+"""
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from lists.forms import BulkItemForm
+from lists.models import List
+from lists.pagination import get_cursor, keyset_page
+
+
+ITEMS_PER_PAGE = 1000
+
+
+def _get_list_or_404(list_id):
+    try:
+        return List.objects.get(id=list_id), None
+    except List.DoesNotExist:
+        return None, JsonResponse({'error': 'List not found'}, status=404)
+
+
+@require_GET
+def list_detail(request, list_id):
+    """Return the list and a page of its items (see lists.pagination)."""
+    list_, error_response = _get_list_or_404(list_id)
+    if error_response:
+        return error_response
+
+    items, next_after = keyset_page(list_.item_set.all(),
+                                    get_cursor(request),
+                                    ITEMS_PER_PAGE)
+    return JsonResponse({
+        'id': list_.id,
+        'name': list_.name,
+        'owner': list_.owner_id,
+        'items': [{'id': item.id, 'text': item.text} for item in items],
+        'next_after': next_after,
+    })
+
+
+@csrf_exempt
+@require_POST
+def add_items(request, list_id):
+    """Add many items to a list in one request.
+
+    Expects a JSON body of the form `{"items": ["text", ...]}`. The valid
+    items are saved even if others aren't; the response lists the texts
+    that were added and, keyed by their position in the request, the
+    error messages for those that weren't. The status is 201 if anything
+    was added, otherwise 400.
+    """
+    list_, error_response = _get_list_or_404(list_id)
+    if error_response:
+        return error_response
+
+    try:
+        texts = json.loads(request.body.decode())['items']
+    except (ValueError, TypeError, KeyError):
+        texts = None
+    if not isinstance(texts, list):
+        return JsonResponse(
+            {'error': 'Expected a JSON object with an "items" array'},
+            status=400
+        )
+
+    form = BulkItemForm(for_list=list_, texts=texts)
+    form.is_valid()
+    items = form.save()
+    return JsonResponse(
+        {
+            'created': [item.text for item in items],
+            'errors': {str(index): messages
+                       for index, messages in form.errors.items()},
+        },
+        status=201 if items else 400
+    )
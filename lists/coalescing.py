@@ -0,0 +1,121 @@
+"""Coalescing of concurrent item additions to the same list.
+
+When many people add items to the same (shared) list at once, each POST
+is normally its own INSERT and its own write transaction, and on SQLite
+the writes queue up behind each other. With coalescing switched on (see
+ITEM_COALESCING_WINDOW in settings), the first request to add an item to
+a list waits for the window to pass, collecting the items other requests
+add to the same list meanwhile, and then writes them all in one
+transaction with one (batched) INSERT (see lists.forms.BulkItemForm).
+Each request still gets its own result: its item, or its validation
+errors (e.g., if its text was already in the list, or was added by an
+earlier request in the same batch).
+
+The price is that adding an item takes up to the window longer (and a
+request gives up, with TimeoutError, if its batch still hasn't been
+written WAIT_TIMEOUT seconds after that). And
+batches are collected within one server process, so only requests
+handled by different threads of the same process can share a batch: run
+gunicorn with several threads (`--threads`) for this to be any use.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from lists.forms import BulkItemForm
+from superlists.metrics import registry
+
+
+WAIT_TIMEOUT = 30  # seconds, on top of the window
+
+
+class _Batch:
+    """The items waiting to be added to one list."""
+
+    def __init__(self, list_):
+        self.list = list_
+        self.texts = []
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+    def write(self):
+        """Add the batch's items to the list, and set `results` to an
+        (item, errors) pair for each of `texts`.
+        """
+        form = BulkItemForm(self.list, self.texts)
+        form.is_valid()
+        saved = iter(form.save())
+        self.results = [
+            (None, form.errors[index]) if index in form.errors
+            else (next(saved), None)
+            for index in range(len(self.texts))
+        ]
+
+    def wait(self, index, timeout):
+        """Wait (up to `timeout` seconds) for the batch to be written,
+        and return the result for its `index`th text.
+        """
+        if not self.done.wait(timeout):
+            raise TimeoutError('timed out waiting for an item batch write')
+        if self.error is not None:
+            raise self.error
+        return self.results[index]
+
+
+class ItemWriteCoalescer:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batches = {}  # list id -> the batch still collecting items
+
+    def add(self, list_, text, window):
+        """Add an item with `text` to `list_`, batched with the other
+        items added to it in the next `window` seconds, and return an
+        (item, errors) pair: the new item and None, or None and a list
+        of error messages.
+        """
+        with self._lock:
+            batch = self._batches.get(list_.id)
+            is_leader = batch is None
+            if is_leader:
+                batch = self._batches[list_.id] = _Batch(list_)
+            index = len(batch.texts)
+            batch.texts.append(text)
+
+        if is_leader:
+            try:
+                time.sleep(window)
+                self._close(batch)
+                batch.write()
+                registry.increment('item_write_batches')
+                registry.increment('item_writes_coalesced', len(batch.texts))
+            except Exception as e:
+                batch.error = e
+            finally:
+                # whatever went wrong, the followers mustn't be left
+                # waiting, nor later requests joining a dead batch
+                self._close(batch)
+                batch.done.set()
+        return batch.wait(index, window + WAIT_TIMEOUT)
+
+    def _close(self, batch):
+        """Stop `batch` collecting items (if it still is)."""
+        with self._lock:
+            if self._batches.get(batch.list.id) is batch:
+                del self._batches[batch.list.id]
+
+
+_coalescer = ItemWriteCoalescer()
+
+
+def is_enabled():
+    return bool(settings.ITEM_COALESCING_WINDOW)
+
+
+def add_item(list_, text):
+    """Add an item to `list_` via the shared coalescer (see
+    ItemWriteCoalescer.add).
+    """
+    return _coalescer.add(list_, text, settings.ITEM_COALESCING_WINDOW)
@@ -0,0 +1,76 @@
+"""Streaming exports of lists' items as NDJSON or CSV.
+
+Each row is one item: the id of its list, the list owner's email (if any)
+and the item's text. Rows are read with `QuerySet.iterator()`, which
+fetches them from the DB in chunks rather than loading (and caching) the
+whole result, and are sent as they are produced, so an export of any size
+uses a flat amount of memory and starts arriving straight away.
+"""
+import csv
+import json
+
+from lists.models import Item
+
+
+FIELDS = ('list', 'owner', 'item')
+CHUNK_SIZE = 2000
+
+
+def export_rows(items):
+    """Yield a (list id, owner email, text) tuple for each of the `items`
+    (a queryset of Item), in list then item order.
+    """
+    yield from items.order_by('list_id', 'id').values_list(
+        'list_id', 'list__owner_id', 'text'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _chunked(lines):
+    """Join `lines` into chunks of up to CHUNK_SIZE lines, so that we
+    don't hand the server one tiny write per row.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row))) + '\n'
+
+
+class _Echo:
+    """A file-like object that `csv.writer` can write to, which returns
+    what it is given instead of storing it, so that each row comes back
+    from `writerow()`.
+    (See https://docs.djangoproject.com/en/2.1/howto/outputting-csv/#streaming-large-csv-files)
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', _ndjson_lines),
+    'csv': ('text/csv', _csv_lines),
+}
+
+
+def export(items, export_format):
+    """Return (`content_type`, `content`) for a streamed export of
+    `items` in `export_format` (one of EXPORT_FORMATS).
+    """
+    content_type, to_lines = EXPORT_FORMATS[export_format]
+    return content_type, _chunked(to_lines(export_rows(items)))
@@ -1,5 +1,5 @@
 from django import forms
-from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
 
 from lists.models import Item, List
 
@@ -61,12 +61,130 @@ class ExistingListItemForm(ItemForm):
         self.instance.list = for_list
 
     def validate_unique(self):
+        # We don't check the (list, text) unique_together constraint here:
+        # that would mean a SELECT before every INSERT, and two identical
+        # POSTs arriving together could both pass it anyway. Instead
+        # `save()` just tries the INSERT and lets the DB's unique index
+        # tell us if it's a duplicate.
+        pass
+
+    def save(self):
+        """Save the item, returning it, or return None (with the
+        duplicate item error added to the form) if the list already has
+        an item with the same text.
+        """
+        # (imported here, as lists.coalescing uses the forms in this
+        # module)
+        from lists import coalescing
+        if coalescing.is_enabled():
+            item, errors = coalescing.add_item(self.instance.list,
+                                               self.instance.text)
+            for error in errors or []:
+                self.add_error('text', error)
+            return item
+
+        # Inside a transaction (e.g., in the tests) a failed INSERT would
+        # break the whole transaction, so atomic() gives it a savepoint to
+        # roll back to. (In autocommit mode it's just a transaction around
+        # the INSERT.)
+        try:
+            with transaction.atomic():
+                return super().save()
+        except IntegrityError:
+            # (something else could in principle have failed, e.g., the
+            # list being deleted meanwhile, so make sure)
+            if not Item.objects.filter(list=self.instance.list,
+                                       text=self.instance.text).exists():
+                raise
+            self.add_error('text', ERROR_MESSAGES['duplicate item'])
+            return None
+
+
+class BulkItemForm:
+    """Validates and saves many new items for one list in one go.
+
+    This mirrors the ExistingListItemForm API (`is_valid()`, `errors` and
+    `save()`) but takes a sequence of item texts. Rather than a uniqueness
+    query and an INSERT per item, we check all the texts against the
+    list's existing items with one set-based query and insert the valid
+    ones with `bulk_create`.
+
+    `errors` maps the index of each invalid text to its error messages.
+    Invalid texts are skipped on `save()`; the valid ones are still saved.
+    (A text that someone else adds to the list between the check and the
+    INSERT gets a duplicate error from `save()`.)
+    """
+
+    def __init__(self, for_list, texts):
+        self.list = for_list
+        self.texts = texts
+        self.errors = None
+        self.cleaned_texts = []
+        self._cleaned_indexes = []
+
+    def is_valid(self):
+        self.errors = {}
+        self.cleaned_texts = []
+        self._cleaned_indexes = []
+
+        # field-level validation (e.g., blank items) is the same as for a
+        # single item, so we let ItemForm do it (this doesn't touch the
+        # DB)
+        candidates = {}
+        for index, text in enumerate(self.texts):
+            form = ItemForm(data={'text': text})
+            if form.is_valid():
+                candidates[index] = form.cleaned_data['text']
+            else:
+                self.errors[index] = form.errors['text']
+
+        existing = self._existing_texts(set(candidates.values()))
+        seen = set()
+        for index, text in candidates.items():
+            if text in existing or text in seen:
+                self.errors[index] = [ERROR_MESSAGES['duplicate item']]
+            else:
+                seen.add(text)
+                self.cleaned_texts.append(text)
+                self._cleaned_indexes.append(index)
+
+        return not self.errors
+
+    def _existing_texts(self, texts):
+        """Return the subset of `texts` already in the list."""
+        texts = list(texts)
+        # SQLite limits the number of parameters in a query, so very big
+        # batches need a few queries
+        max_params = connection.features.max_query_params
+        # (leaving room for the list id)
+        batch_size = max_params - 1 if max_params else max(len(texts), 1)
+        existing = set()
+        for start in range(0, len(texts), batch_size):
+            existing.update(Item.objects.filter(
+                list=self.list,
+                text__in=texts[start:start + batch_size]
+            ).values_list('text', flat=True))
+        return existing
+
+    def save(self):
+        if self.errors is None:
+            self.is_valid()
         try:
-            # the Model.validate_unique() method validates all uniqueness
-            # constraints (e.g., `unique`, `unique_together`) on the model
-            self.instance.validate_unique()
-        except ValidationError as e:
-            # Here we are overriding the error message
-            e.error_dict = {'text': [ERROR_MESSAGES['duplicate item']]}
-            self._update_errors(e)
+            # (add_items is atomic, so this is all or nothing)
+            return self.list.add_items(self.cleaned_texts)
+        except IntegrityError:
+            # Another request added one of our texts between the duplicate
+            # check and the INSERT, so we fall back to adding them one at
+            # a time.
+            return self._save_one_at_a_time()
 
+    def _save_one_at_a_time(self):
+        items = []
+        for index, text in zip(self._cleaned_indexes, self.cleaned_texts):
+            try:
+                with transaction.atomic():
+                    items.append(Item.objects.create(list=self.list,
+                                                     text=text))
+            except IntegrityError:
+                self.errors[index] = [ERROR_MESSAGES['duplicate item']]
+        return items
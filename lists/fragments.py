@@ -0,0 +1,67 @@
+"""Cache of rendered page fragments.
+
+Lists are read far more often than they are written, so rather than
+querying and re-rendering a list's item table on every view, we cache the
+rendered HTML. Instead of deleting cached fragments when a list changes
+(which would mean knowing every key we might have stored for it, e.g., one
+per page), each list has a version counter that is part of every fragment
+key. Writes bump the counter, after which the old fragments are simply
+never read again and age out of the cache.
+
+The counters live in Django's cache framework along with the fragments
+(see CACHES in settings). Note that the local-memory backend is
+per-process: when running several server processes use a shared backend
+(e.g., the file-based one) so that all of them see each version bump.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(list_id):
+    return f'lists:list:{list_id}:version'
+
+
+def _initial_version():
+    # If a counter is missing (never set, or evicted) we can't know which
+    # versions have already been used, so rather than restart at 1 (and
+    # risk reading a fragment cached under an old version 1) we start
+    # from the current time.
+    return int(time.time() * 1000)
+
+
+def get_list_version(list_id):
+    key = _version_key(list_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_list_version(list_id):
+    _bump(list_id)
+    # Inside a transaction, other requests still see the old items until
+    # it commits, and may cache them under the version we've just bumped
+    # to. So we bump again once they can see the new ones. (The bump now
+    # is for the rest of this transaction, which already sees them.)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(list_id))
+
+
+def _bump(list_id):
+    key = _version_key(list_id)
+    try:
+        cache.incr(key)
+    except ValueError:  # no counter yet
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def item_table_key(list_id, after=None, offset=0):
+    """The cache key for the item table fragment of the page of list
+    `list_id` that starts after item `after`, numbering its items from
+    `offset` (see lists.views).
+    """
+    version = get_list_version(list_id)
+    return f'lists:list:{list_id}:v{version}:item_table:{after}:{offset}'
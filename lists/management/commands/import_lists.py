@@ -0,0 +1,225 @@
+import csv
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+User = get_user_model()
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+
+from lists import fragments
+from lists.models import Item, List, ListSharee
+
+
+class Command(BaseCommand):
+    """Import lists from an NDJSON or CSV file.
+
+    Each row has a `list` key (any string identifying the list within the
+    file) and optionally an `owner` email, an `item` text and/or a
+    `sharee` email. This is the format lists.export produces (plus the
+    `sharee` column), so an export can be imported straight back in. Every
+    list key in the file becomes a new List; rows with the same key add to
+    the same list.
+
+    Rows are read as a stream and written in batches, one transaction per
+    batch, using bulk inserts rather than `List.create_new` and friends
+    (which run a few queries per item).
+    """
+    help = 'Import lists, items and sharees from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="the file to import, or '-' for stdin")
+        parser.add_argument('--format', choices=['ndjson', 'csv'],
+                            help='defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='rows per transaction')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        importer = ListImporter(batch_size=options['batch_size'])
+
+        start = time.time()
+        if path == '-':
+            importer.import_rows(read_rows(sys.stdin, import_format))
+        else:
+            with open(path, newline='') as f:
+                importer.import_rows(read_rows(f, import_format))
+        elapsed = max(time.time() - start, 1e-6)
+
+        self.stdout.write(
+            f'Imported {importer.list_count} lists, '
+            f'{importer.item_count} items and '
+            f'{importer.sharee_count} sharees in {elapsed:.2f}s '
+            f'({importer.item_count / elapsed:.0f} items/s)'
+        )
+
+
+def read_rows(f, import_format):
+    """Yield (line number, row dict) for each row in the file `f`."""
+    if import_format == 'csv':
+        # (line 1 is the header)
+        yield from enumerate(csv.DictReader(f), start=2)
+        return
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise CommandError(f'Line {line_number}: invalid JSON ({e})')
+        if not isinstance(row, dict):
+            raise CommandError(f'Line {line_number}: expected a JSON object')
+        yield line_number, row
+
+
+def _chunks(values, size=500):
+    """Split `values` up to stay within SQLite's limit on the number of
+    parameters in a query.
+    """
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class ListImporter:
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.list_ids = {}  # list key in the file -> List id
+        self.unnamed_list_ids = set()
+        # Django 2.1's bulk_create can't skip rows that violate a unique
+        # constraint (`ignore_conflicts` is new in 2.2), so we remember
+        # what we've inserted and drop duplicates before inserting. Every
+        # list we add to is new, so its items and sharees all come from
+        # this file.
+        self.item_texts = {}  # List id -> set of item texts
+        self.sharee_emails = {}  # List id -> set of sharee emails
+        self.known_users = set()
+        self.list_count = 0
+        self.item_count = 0
+        self.sharee_count = 0
+
+    def import_rows(self, rows):
+        batch = []
+        for line_number, row in rows:
+            batch.append(self._clean_row(line_number, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+
+    def _clean_row(self, line_number, row):
+        key = row.get('list')
+        if key is None or key == '':
+            raise CommandError(f'Line {line_number}: missing list')
+        cleaned = {'list': str(key)}
+        for field in ('owner', 'sharee'):
+            email = (row.get(field) or '').strip()
+            if email:
+                try:
+                    validate_email(email)
+                except ValidationError:
+                    raise CommandError(
+                        f'Line {line_number}: invalid {field} email {email}'
+                    )
+            cleaned[field] = email
+        cleaned['item'] = str(row.get('item') or '').strip()
+        return cleaned
+
+    def _import_batch(self, batch):
+        with transaction.atomic():
+            self._create_users(
+                row['owner'] for row in batch
+                if row['owner'] and row['list'] not in self.list_ids
+            )
+            self._create_lists(batch)
+            self._create_items(batch)
+            self._create_sharees(batch)
+
+    def _create_users(self, emails):
+        emails = set(emails) - self.known_users
+        if not emails:
+            return
+        existing = set()
+        for chunk in _chunks(list(emails)):
+            existing.update(User.objects.filter(
+                email__in=chunk
+            ).values_list('email', flat=True))
+        User.objects.bulk_create(User(email=email)
+                                 for email in emails - existing)
+        self.known_users |= emails
+
+    def _create_lists(self, batch):
+        new_lists = {}
+        for row in batch:
+            key = row['list']
+            if key in self.list_ids:
+                continue
+            if key not in new_lists:
+                new_lists[key] = List(owner_id=row['owner'] or None)
+            list_ = new_lists[key]
+            if row['item'] and not list_.first_item_text:
+                list_.first_item_text = row['item']
+        if not new_lists:
+            return
+
+        if connection.features.can_return_ids_from_bulk_insert:
+            List.objects.bulk_create(new_lists.values())
+            for list_ in new_lists.values():
+                fragments.bump_list_version(list_.id)
+        else:
+            # e.g., SQLite: bulk_create wouldn't give us the new ids, which
+            # we need for the items, so insert the lists one at a time
+            # (still inside the batch's transaction, and there are
+            # usually far fewer lists than items)
+            for list_ in new_lists.values():
+                list_.save()
+
+        for key, list_ in new_lists.items():
+            self.list_ids[key] = list_.id
+            self.item_texts[list_.id] = set()
+            self.sharee_emails[list_.id] = set()
+            if not list_.first_item_text:
+                self.unnamed_list_ids.add(list_.id)
+        self.list_count += len(new_lists)
+
+    def _create_items(self, batch):
+        items = []
+        for row in batch:
+            list_id = self.list_ids[row['list']]
+            text = row['item']
+            if text and text not in self.item_texts[list_id]:
+                self.item_texts[list_id].add(text)
+                items.append(Item(list_id=list_id, text=text))
+        if not items:
+            return
+        Item.objects.bulk_create(items)
+        self.item_count += len(items)
+
+        # lists whose first row didn't have an item
+        named = self.unnamed_list_ids & {item.list_id for item in items}
+        for chunk in _chunks(list(named)):
+            List.objects.filter(id__in=chunk).sync_names()
+        self.unnamed_list_ids -= named
+        for chunk in _chunks(list({item.list_id for item in items})):
+            List.objects.filter(id__in=chunk).mark_modified()
+
+    def _create_sharees(self, batch):
+        sharees = []
+        for row in batch:
+            list_id = self.list_ids[row['list']]
+            email = row['sharee']
+            if email and email not in self.sharee_emails[list_id]:
+                self.sharee_emails[list_id].add(email)
+                sharees.append(ListSharee(todolist_id=list_id, email=email))
+        ListSharee.objects.bulk_create(sharees)
+        for chunk in _chunks(list({sharee.todolist_id
+                                   for sharee in sharees})):
+            List.objects.filter(id__in=chunk).mark_modified()
+        self.sharee_count += len(sharees)
@@ -0,0 +1,33 @@
+# Generated by Django 2.1.2 on 2026-10-17 22:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_first_item_text(apps, schema_editor):
+    List = apps.get_model('lists', 'List')
+    Item = apps.get_model('lists', 'Item')
+    first_item_text = Item.objects.filter(
+        list=OuterRef('pk')
+    ).order_by('id').values('text')[:1]
+    List.objects.update(
+        first_item_text=Coalesce(Subquery(first_item_text), Value(''))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='first_item_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(populate_first_item_text,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.1.2 on 2026-10-17 22:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0002_list_first_item_text'),
+    ]
+
+    # (the new (list, id) index is added before the old list index is
+    # dropped, so item lookups are never left without one)
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['list', 'id'], name='lists_item_list_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='list',
+            field=models.ForeignKey(db_index=False, default=None, on_delete=django.db.models.deletion.CASCADE, to='lists.List'),
+        ),
+        migrations.AlterField(
+            model_name='listsharee',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254),
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.conf import settings
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import (Case, Count, Exists, F, IntegerField,
+                              OuterRef, Q, Subquery, Value, When)
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 from django.conf import settings
+
+from lists import fragments
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -11,30 +17,133 @@ class Item(models.Model):
     list = models.ForeignKey(
         'List',
         on_delete=models.CASCADE,
-        default=None)
+        default=None,
+        db_index=False)  # (the (list, id) index below covers lookups by
+                         # list, so a separate one would be redundant)
 
     class Meta:
         ordering = ('id',)
         unique_together = ('list', 'text')
+        # A list's items are always fetched in id order (including the
+        # keyset pagination in lists.pagination), so with an index on
+        # (list, id) the DB can read them straight off the index rather
+        # than fetching them all and sorting them.
+        indexes = [
+            models.Index(fields=['list', 'id'], name='lists_item_list_id_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # (this also keeps the list's denormalized name in step with its
+        # first item, in the same UPDATE)
+        self.list.mark_modified(first_item_text=self.text)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.list.mark_modified()
+        if self.list.first_item_text == self.text:
+            self.list.sync_name()
+        return result
 
     def __str__(self):
         return self.text
 
 
+class ListQuerySet(models.QuerySet):
+
+    def sync_names(self):
+        """Recompute `first_item_text` for every list in the queryset
+        with a single UPDATE (rather than one query per list), e.g., to
+        backfill the column or repair it after a bulk item delete
+        (QuerySet.delete() bypasses `Item.delete()`).
+        """
+        first_item_text = Item.objects.filter(
+            list=OuterRef('pk')
+        ).order_by('id').values('text')[:1]
+        return self.update(
+            first_item_text=Coalesce(Subquery(first_item_text), Value(''))
+        )
+
+    def mark_modified(self):
+        """Record that the lists in the queryset have changed (see
+        `List.modified`), e.g., after adding items to them in bulk.
+        """
+        ids = list(self.values_list('id', flat=True))
+        self.update(modified=timezone.now())
+        for list_id in ids:
+            fragments.bump_list_version(list_id)
+
+    def owned_or_shared_with(self, email):
+        """Lists owned by, or shared with, the user with `email`."""
+        # We find the lists with two indexed lookups (by owner, and by
+        # sharee email): filtering on an `is_shared` annotation instead
+        # would mean checking every list in the DB.
+        shared_ids = ListSharee.objects.filter(
+            email=email
+        ).values('todolist_id')
+        return self.filter(Q(owner_id=email) | Q(id__in=shared_ids))
+
+    def for_user(self, email):
+        """Lists owned by, or shared with, the user with `email`, each
+        annotated with `is_shared` (True if shared with that user).
+        """
+        shared = ListSharee.objects.filter(todolist=OuterRef('pk'),
+                                           email=email)
+        return self.owned_or_shared_with(email).annotate(
+            is_shared=Exists(shared)
+        )
+
+    def with_summaries(self):
+        """Annotate each list with `item_count` and `owner_email` so that
+        pages showing many lists don't need any per-list queries.
+        """
+        # a correlated subquery (rather than Count('item')) keeps the item
+        # count from multiplying with, or grouping by, other annotations
+        item_count = Item.objects.filter(
+            list=OuterRef('pk')
+        ).order_by().values('list').annotate(count=Count('pk')).values('count')
+        return self.annotate(
+            item_count=Coalesce(
+                Subquery(item_count, output_field=IntegerField()),
+                Value(0)
+            ),
+            owner_email=F('owner__email'),
+        )
+
+
 class List(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL,
                               on_delete=models.CASCADE,
                               blank=True,
                               null=True)
+    # `name` is the text of the list's first item. Deriving it on every
+    # access costs a query per list, which adds up on pages that show
+    # many lists (e.g., My Lists), so we store a denormalized copy that
+    # `Item.save()` and `Item.delete()` keep in sync.
+    first_item_text = models.TextField(blank=True, default='')
+    # When anything the list's page shows (its items and sharees) last
+    # changed, so that the list pages can answer conditional GETs (see
+    # lists.views) without loading or rendering any of it.
+    modified = models.DateTimeField(default=timezone.now)
+
+    objects = ListQuerySet.as_manager()
 
     @property
     def name(self):
-        first = self.item_set.first()
-        if first:
-            return self.item_set.first().text
+        if self.first_item_text:
+            return self.first_item_text
         else:
             return "Empty List"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            # A new list may reuse the id of a deleted one (e.g., SQLite
+            # reuses the highest rowid), so make sure it doesn't inherit
+            # that list's cached fragments.
+            fragments.bump_list_version(self.pk)
+
     @property
     def sharees(self):
         return self.listsharee_set.all()
@@ -42,23 +151,110 @@ class List(models.Model):
     def get_absolute_url(self):
         return reverse('view_list', args=[self.id])
 
+    def sync_name(self):
+        List.objects.filter(pk=self.pk).sync_names()
+        self.refresh_from_db(fields=['first_item_text'])
+
+    def mark_modified(self, first_item_text=None):
+        """Record that the list has changed, with a single UPDATE. If
+        the list doesn't have a name yet, `first_item_text` (the text of
+        an item just added) becomes its name in the same UPDATE.
+        """
+        now = timezone.now()
+        updates = {'modified': now}
+        # We only need to set the name when the (in-memory) list doesn't
+        # have one yet; the condition in the UPDATE makes sure we never
+        # overwrite a name set meanwhile by someone else.
+        if first_item_text and not self.first_item_text:
+            updates['first_item_text'] = Case(
+                When(first_item_text='', then=Value(first_item_text)),
+                default=F('first_item_text'),
+                output_field=models.TextField()
+            )
+            self.first_item_text = first_item_text
+        List.objects.filter(pk=self.pk).update(**updates)
+        self.modified = now
+        fragments.bump_list_version(self.pk)
+
     @staticmethod
     def create_new(first_item_text, owner=None):
-        list_ = List.objects.create(owner=owner)
-        Item.objects.create(text=first_item_text, list=list_)
+        # by creating the list with its name already set, saving the
+        # first item doesn't need a second write to the list row. Both
+        # INSERTs are one transaction, so we never leave a list without
+        # its first item, and (on SQLite) only wait for one commit to
+        # reach the disk rather than two.
+        with transaction.atomic():
+            list_ = List.objects.create(owner=owner,
+                                        first_item_text=first_item_text)
+            Item.objects.create(text=first_item_text, list=list_)
         return list_
 
+    @staticmethod
+    def create_many(first_item_texts, owner=None):
+        """Create a list for each of `first_item_texts` (each with that
+        as its first item) in one transaction, with batched INSERTs, and
+        return the new lists.
+        """
+        lists = [List(owner=owner, first_item_text=text)
+                 for text in first_item_texts]
+        if not lists:
+            return lists
+        with transaction.atomic():
+            if connection.features.can_return_ids_from_bulk_insert:
+                List.objects.bulk_create(lists)
+                # (bulk_create skips save(), see above)
+                for list_ in lists:
+                    fragments.bump_list_version(list_.pk)
+            else:
+                # e.g., SQLite, where a bulk insert can't tell us the new
+                # lists' ids, which their items need
+                for list_ in lists:
+                    list_.save()
+            Item.objects.bulk_create(
+                Item(list=list_, text=list_.first_item_text)
+                for list_ in lists
+            )
+        return lists
+
+    def add_items(self, texts):
+        """Add an item to the list for each of `texts` with a single
+        (batched) INSERT, skipping the per-item work `Item.save()` does.
+        The caller is responsible for validation (see
+        lists.forms.BulkItemForm).
+        """
+        items = [Item(list=self, text=text) for text in texts]
+        if not items:
+            return items
+        with transaction.atomic():
+            Item.objects.bulk_create(items)
+            self.mark_modified(first_item_text=items[0].text)
+        return items
+
     def share(self, email):
-        sharee, _ = ListSharee.objects.get_or_create(
+        sharee, created = ListSharee.objects.get_or_create(
             todolist=self,
             email=email
         )
+        if created:
+            self.mark_modified()
         return sharee
 
     def __str__(self):
         return f'{self.owner if self.owner else "no owner"}: {self.name}'
 
 
+class ListShareeQuerySet(models.QuerySet):
+
+    def with_accounts(self):
+        """Annotate each sharee with `has_account` (whether a User with
+        the sharee's email exists) in the same query, instead of one
+        `ListSharee.user` lookup per sharee.
+        """
+        return self.annotate(
+            has_account=Exists(User.objects.filter(email=OuterRef('email')))
+        )
+
+
 class ListSharee(models.Model):
     """ListSharee behaves a bit like a MTM intermediary model.
     If every email was going to be an actual User, we could
@@ -78,7 +274,11 @@ class ListSharee(models.Model):
     """
 
     todolist = models.ForeignKey('List', on_delete=models.CASCADE)
-    email = models.EmailField()
+    # (the unique_together index starts with todolist, so it can't be
+    # used to find everything shared with an email)
+    email = models.EmailField(db_index=True)
+
+    objects = ListShareeQuerySet.as_manager()
  
     @property
     def user(self):
@@ -0,0 +1,44 @@
+"""Keyset ("seek") pagination.
+
+Rather than an OFFSET, which makes the DB walk every skipped row, each
+page carries the id of its last row and the next page asks for rows with
+`id > after`. That's an index range scan whatever page we're on. (For the same reason,
+pages that number their rows don't count the rows before them: the link
+to the next page carries the count along, as `?after=<id>&n=<count>`.)
+"""
+
+
+def get_cursor(request):
+    """Return the `?after=<id>` cursor from the request, or None for the
+    first page (including if the cursor is missing or malformed).
+    """
+    try:
+        return int(request.GET['after'])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_offset(request):
+    """Return the `?n=<count>` of rows before the page, as carried along
+    with the cursor, or None if it's missing or malformed.
+    """
+    try:
+        offset = int(request.GET['n'])
+    except (KeyError, ValueError):
+        return None
+    return offset if offset >= 0 else None
+
+
+def keyset_page(queryset, after, page_size):
+    """Return (`rows`, `next_cursor`) for the page of `queryset` that
+    follows the row with id `after`. `next_cursor` is None on the last
+    page.
+    """
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    # fetching one extra row tells us if there is a next page without
+    # a separate COUNT query
+    rows = list(queryset.order_by('id')[:page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], rows[page_size - 1].id
+    return rows, None
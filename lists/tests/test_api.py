@@ -0,0 +1,134 @@
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from lists.forms import ERROR_MESSAGES
+from lists.models import Item, List
+
+
+class ListDetailAPITest(TestCase):
+
+    def test_returns_list_and_items_as_json(self):
+        list_ = List.create_new(first_item_text='first')
+        Item.objects.create(list=list_, text='second')
+
+        response = self.client.get(f'/lists/api/lists/{list_.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], list_.id)
+        self.assertEqual(data['name'], 'first')
+        self.assertIsNone(data['owner'])
+        self.assertEqual([item['text'] for item in data['items']],
+                         ['first', 'second'])
+        self.assertIsNone(data['next_after'])
+
+    def test_returns_404_for_missing_list(self):
+        response = self.client.get('/lists/api/lists/999/')
+        self.assertEqual(response.status_code, 404)
+
+
+class AddItemsAPITest(TestCase):
+
+    def post_items(self, list_, items):
+        return self.client.post(
+            f'/lists/api/lists/{list_.id}/items',
+            data=json.dumps({'items': items}),
+            content_type='application/json'
+        )
+
+    def test_adds_all_items(self):
+        list_ = List.objects.create()
+
+        response = self.post_items(list_, ['a', 'b', 'c'])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(),
+                         {'created': ['a', 'b', 'c'], 'errors': {}})
+        self.assertEqual(
+            list(list_.item_set.values_list('text', flat=True)),
+            ['a', 'b', 'c']
+        )
+
+    def test_first_item_names_empty_list(self):
+        list_ = List.objects.create()
+
+        self.post_items(list_, ['a', 'b'])
+
+        self.assertEqual(List.objects.get(id=list_.id).name, 'a')
+
+    def test_reports_per_item_errors_and_saves_valid_items(self):
+        list_ = List.create_new(first_item_text='existing')
+
+        response = self.post_items(list_, ['new', '', 'existing', 'new'])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {
+            'created': ['new'],
+            'errors': {
+                '1': [ERROR_MESSAGES['blank item']],
+                '2': [ERROR_MESSAGES['duplicate item']],
+                '3': [ERROR_MESSAGES['duplicate item']],
+            },
+        })
+        self.assertEqual(list_.item_set.count(), 2)
+
+    def test_reports_items_added_meanwhile_by_someone_else(self):
+        # (as if another request added 'b' after the duplicate check)
+        list_ = List.create_new(first_item_text='existing')
+        Item.objects.create(list=list_, text='b')
+
+        with patch('lists.forms.BulkItemForm._existing_texts',
+                   return_value=set()):
+            response = self.post_items(list_, ['a', 'b', 'c'])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {
+            'created': ['a', 'c'],
+            'errors': {'1': [ERROR_MESSAGES['duplicate item']]},
+        })
+        self.assertEqual(list_.item_set.count(), 4)
+
+    def test_returns_400_if_nothing_added(self):
+        list_ = List.create_new(first_item_text='existing')
+
+        response = self.post_items(list_, ['existing'])
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_uses_constant_queries_however_many_items(self):
+        list_ = List.create_new(first_item_text='existing')
+
+        # get the list, check duplicates, then one INSERT and one UPDATE
+        # of the list's `modified` (plus the SAVEPOINT and RELEASE of its
+        # transaction, since TestCase runs each test inside a transaction)
+        with self.assertNumQueries(6):
+            self.post_items(list_, [f'item {i}' for i in range(10)])
+        with self.assertNumQueries(6):
+            self.post_items(list_, [f'other item {i}' for i in range(400)])
+
+    def test_rejects_malformed_body(self):
+        list_ = List.objects.create()
+
+        response = self.client.post(
+            f'/lists/api/lists/{list_.id}/items',
+            data='not json',
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Item.objects.count(), 0)
+
+    def test_does_not_need_csrf_token(self):
+        self.client.handler.enforce_csrf_checks = True
+        list_ = List.objects.create()
+
+        response = self.post_items(list_, ['a'])
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_GET_not_allowed(self):
+        list_ = List.objects.create()
+        response = self.client.get(f'/lists/api/lists/{list_.id}/items')
+        self.assertEqual(response.status_code, 405)
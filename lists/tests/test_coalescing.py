@@ -0,0 +1,149 @@
+import threading
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from lists import coalescing
+from lists.forms import ERROR_MESSAGES, ExistingListItemForm
+from lists.models import Item, List
+from superlists.metrics import registry
+
+
+class CoalescerTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_single_item_is_added(self):
+        list_ = List.create_new(first_item_text='first')
+
+        item, errors = coalescing.ItemWriteCoalescer().add(list_, 'second',
+                                                           window=0)
+
+        self.assertIsNone(errors)
+        self.assertEqual(item.text, 'second')
+        self.assertEqual(list(list_.item_set.values_list('text', flat=True)),
+                         ['first', 'second'])
+
+    def test_duplicate_gets_error(self):
+        list_ = List.create_new(first_item_text='first')
+
+        item, errors = coalescing.ItemWriteCoalescer().add(list_, 'first',
+                                                           window=0)
+
+        self.assertIsNone(item)
+        self.assertEqual(errors, [ERROR_MESSAGES['duplicate item']])
+
+    def test_falls_back_to_one_at_a_time_if_batch_conflicts(self):
+        # (as if another process added 'second' after the duplicate check)
+        list_ = List.create_new(first_item_text='first')
+        Item.objects.create(list=list_, text='second')
+
+        with patch('lists.forms.BulkItemForm._existing_texts',
+                   return_value=set()):
+            item, errors = coalescing.ItemWriteCoalescer().add(
+                list_, 'second', window=0
+            )
+
+        self.assertIsNone(item)
+        self.assertEqual(errors, [ERROR_MESSAGES['duplicate item']])
+        self.assertEqual(list_.item_set.count(), 2)
+
+    def test_other_errors_are_raised(self):
+        list_ = List.create_new(first_item_text='first')
+
+        with patch('lists.models.Item.objects.bulk_create',
+                   side_effect=ValueError('boom')):
+            with self.assertRaises(ValueError):
+                coalescing.ItemWriteCoalescer().add(list_, 'second', window=0)
+
+    def test_batch_is_closed_even_if_leader_fails_before_writing(self):
+        list_ = List.create_new(first_item_text='first')
+        coalescer = coalescing.ItemWriteCoalescer()
+
+        with patch('lists.coalescing.time.sleep',
+                   side_effect=ValueError('boom')):
+            with self.assertRaises(ValueError):
+                coalescer.add(list_, 'second', window=0)
+
+        item, errors = coalescer.add(list_, 'second', window=0)
+        self.assertEqual(item.text, 'second')
+
+    def test_followers_stop_waiting_eventually(self):
+        list_ = List.create_new(first_item_text='first')
+        batch = coalescing._Batch(list_)
+
+        with self.assertRaises(TimeoutError):
+            batch.wait(0, timeout=0.01)
+
+
+class ExistingListItemFormCoalescingTest(TestCase):
+
+    @override_settings(ITEM_COALESCING_WINDOW=0.001)
+    def test_form_saves_through_coalescer(self):
+        list_ = List.create_new(first_item_text='first')
+        form = ExistingListItemForm(for_list=list_, data={'text': 'second'})
+        form.is_valid()
+
+        with patch('lists.coalescing.add_item',
+                   wraps=coalescing.add_item) as mock_add_item:
+            item = form.save()
+
+        mock_add_item.assert_called_once_with(list_, 'second')
+        self.assertEqual(item.text, 'second')
+
+    @override_settings(ITEM_COALESCING_WINDOW=0.001)
+    def test_form_gets_duplicate_error_from_coalescer(self):
+        list_ = List.create_new(first_item_text='first')
+        form = ExistingListItemForm(for_list=list_, data={'text': 'first'})
+        form.is_valid()
+
+        self.assertIsNone(form.save())
+        self.assertEqual(form.errors['text'],
+                         [ERROR_MESSAGES['duplicate item']])
+
+    def test_off_by_default(self):
+        self.assertFalse(coalescing.is_enabled())
+
+
+# (TransactionTestCase, so that the item writes, which happen on whichever
+# thread leads the batch, are visible to the others. Only the leader
+# touches the DB, so this works with the in-memory SQLite test DB too.)
+class ConcurrentCoalescingTest(TransactionTestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_concurrent_additions_are_written_as_one_batch(self):
+        list_ = List.create_new(first_item_text='existing')
+        texts = [f'item {i}' for i in range(20)] + ['existing', 'item 0']
+        coalescer = coalescing.ItemWriteCoalescer()
+        results = {}
+        barrier = threading.Barrier(len(texts))
+
+        def add(index, text):
+            barrier.wait()
+            try:
+                results[index] = coalescer.add(list_, text, window=0.2)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add, args=(index, text))
+                   for index, text in enumerate(texts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(registry.events()['item_write_batches'], 1)
+        self.assertEqual(
+            sorted(list_.item_set.values_list('text', flat=True)),
+            sorted(set(texts))
+        )
+        # one request per text gets its item, the other duplicates get
+        # errors
+        added = [item.text for item, errors in results.values() if item]
+        self.assertEqual(sorted(added), sorted(f'item {i}' for i in range(20)))
+        failed = [errors for item, errors in results.values() if errors]
+        self.assertEqual(failed, [[ERROR_MESSAGES['duplicate item']]] * 2)
@@ -0,0 +1,105 @@
+import json
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+from lists import export
+from lists.models import Item, List
+
+
+class ExportTest(TestCase):
+
+    def test_export_rows_are_list_owner_and_text(self):
+        owner = User.objects.create(email='a@b.com')
+        list_ = List.create_new(first_item_text='first', owner=owner)
+        Item.objects.create(list=list_, text='second')
+
+        rows = list(export.export_rows(Item.objects.all()))
+
+        self.assertEqual(rows, [(list_.id, 'a@b.com', 'first'),
+                                (list_.id, 'a@b.com', 'second')])
+
+    def test_export_rows_reads_with_iterator(self):
+        List.create_new(first_item_text='first')
+        with patch('django.db.models.query.QuerySet.iterator') as mock_iter:
+            mock_iter.return_value = iter([])
+            list(export.export_rows(Item.objects.all()))
+
+        mock_iter.assert_called_once_with(chunk_size=export.CHUNK_SIZE)
+
+    @patch('lists.export.CHUNK_SIZE', 2)
+    def test_output_is_chunked(self):
+        list_ = List.create_new(first_item_text='1')
+        list_.add_items(['2', '3'])
+
+        content_type, content = export.export(Item.objects.all(), 'ndjson')
+        chunks = list(content)
+
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [2, 1])
+
+
+class ExportListViewTest(TestCase):
+
+    def test_streams_list_items_as_ndjson(self):
+        list_ = List.create_new(first_item_text='first')
+        Item.objects.create(list=list_, text='second')
+        other_list = List.create_new(first_item_text='other')
+
+        response = self.client.get(f'/lists/{list_.id}/export/')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn(f'list-{list_.id}.ndjson',
+                      response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'list': list_.id, 'owner': None, 'item': 'first'},
+             {'list': list_.id, 'owner': None, 'item': 'second'}]
+        )
+
+    def test_streams_list_items_as_csv(self):
+        list_ = List.create_new(first_item_text='first, with comma')
+
+        response = self.client.get(f'/lists/{list_.id}/export/?format=csv')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(
+            content.splitlines(),
+            ['list,owner,item', f'{list_.id},,"first, with comma"']
+        )
+
+    def test_rejects_unknown_format(self):
+        list_ = List.create_new(first_item_text='first')
+
+        response = self.client.get(f'/lists/{list_.id}/export/?format=xml')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportMyListsViewTest(TestCase):
+
+    def test_exports_owned_and_shared_lists_only(self):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        owned = List.create_new(first_item_text='mine', owner=owner)
+        shared = List.create_new(first_item_text='shared', owner=other)
+        shared.share('a@b.com')
+        List.create_new(first_item_text='not mine', owner=other)
+
+        response = self.client.get('/lists/users/a@b.com/export/')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'list': owned.id, 'owner': 'a@b.com', 'item': 'mine'},
+             {'list': shared.id, 'owner': 'other@b.com', 'item': 'shared'}]
+        )
+
+    def test_does_not_match_my_lists_page(self):
+        User.objects.create(email='a@b.com')
+        response = self.client.get('/lists/users/a@b.com/export/')
+        self.assertTrue(response.streaming)
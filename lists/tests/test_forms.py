@@ -1,11 +1,13 @@
 import unittest
 from unittest.mock import patch, Mock
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from lists.models import Item, List
 from lists.forms import (
     ERROR_MESSAGES,
-    ItemForm, NewListForm, ExistingListItemForm
+    BulkItemForm, ItemForm, NewListForm, ExistingListItemForm
 )
 
 
@@ -95,13 +97,51 @@ class ExistingListItemFormTest(TestCase):
         self.assertEqual(form.errors['text'], [ERROR_MESSAGES['blank item']])
 
     def test_validation_for_duplicate_items(self):
+        # duplicates are found by the DB's unique constraint when saving,
+        # rather than by a query beforehand
         list_ = List.objects.create()
         Item.objects.create(list=list_, text='foo')
         form = ExistingListItemForm(for_list=list_, data={'text': 'foo'})
 
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.save())
         self.assertFalse(form.is_valid())
         self.assertEqual(form.errors['text'], 
                          [ERROR_MESSAGES['duplicate item']])
+        self.assertEqual(Item.objects.filter(list=list_).count(), 1)
+
+    def test_saving_duplicate_leaves_transaction_usable(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='foo')
+        form = ExistingListItemForm(for_list=list_, data={'text': 'foo'})
+        form.is_valid()
+        form.save()
+
+        # (we're inside TestCase's transaction, which would be broken if
+        # the failed INSERT hadn't been rolled back to a savepoint)
+        Item.objects.create(list=list_, text='bar')
+
+    def test_does_not_query_before_inserting(self):
+        list_ = List.objects.create(first_item_text='first')
+        form = ExistingListItemForm(for_list=list_, data={'text': 'foo'})
+
+        with CaptureQueriesContext(connection) as queries:
+            form.is_valid()
+            form.save()
+
+        statements = [query['sql'].split()[0] for query in queries]
+        self.assertNotIn('SELECT', statements)
+        self.assertIn('INSERT', statements)
+
+    def test_other_integrity_errors_are_raised(self):
+        list_ = List.objects.create()
+        form = ExistingListItemForm(for_list=list_, data={'text': 'foo'})
+        form.is_valid()
+
+        with patch('lists.forms.ItemForm.save',
+                   side_effect=IntegrityError('FOREIGN KEY')):
+            with self.assertRaises(IntegrityError):
+                form.save()
 
     def test_save(self):
         """Shouldn't need any args passed to save() on this subclass"""
@@ -110,3 +150,65 @@ class ExistingListItemFormTest(TestCase):
         new_item = form.save()
         self.assertEqual(new_item, Item.objects.all()[0])
 
+
+class BulkItemFormTest(TestCase):
+
+    def test_valid_texts(self):
+        list_ = List.objects.create()
+        form = BulkItemForm(for_list=list_, texts=['a', 'b'])
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.errors, {})
+
+    def test_errors_are_keyed_by_position(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='foo')
+        form = BulkItemForm(for_list=list_, texts=['a', '', 'foo', 'a'])
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors, {
+            1: [ERROR_MESSAGES['blank item']],
+            2: [ERROR_MESSAGES['duplicate item']],
+            3: [ERROR_MESSAGES['duplicate item']],
+        })
+
+    def test_checks_duplicates_with_one_query(self):
+        list_ = List.objects.create()
+        form = BulkItemForm(for_list=list_,
+                            texts=[f'item {i}' for i in range(100)])
+
+        with self.assertNumQueries(1):
+            form.is_valid()
+
+    def test_checks_duplicates_in_batches_beyond_query_param_limit(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='item 1500')
+        form = BulkItemForm(for_list=list_,
+                            texts=[f'item {i}' for i in range(2000)])
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(list(form.errors), [1500])
+
+    def test_save_reports_texts_added_since_the_check(self):
+        list_ = List.objects.create()
+        form = BulkItemForm(for_list=list_, texts=['a', 'b', 'c'])
+        self.assertTrue(form.is_valid())
+        Item.objects.create(list=list_, text='b')
+
+        items = form.save()
+
+        self.assertEqual([item.text for item in items], ['a', 'c'])
+        self.assertEqual(form.errors, {1: [ERROR_MESSAGES['duplicate item']]})
+        self.assertEqual(list_.item_set.count(), 3)
+
+    def test_save_saves_only_valid_texts(self):
+        list_ = List.objects.create()
+        form = BulkItemForm(for_list=list_, texts=['a', '', 'b'])
+        form.is_valid()
+
+        form.save()
+
+        self.assertEqual(
+            list(list_.item_set.values_list('text', flat=True)),
+            ['a', 'b']
+        )
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from lists import fragments
+from lists.forms import ExistingListItemForm
+from lists.models import Item, List
+
+
+class ListVersionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_stable_between_writes(self):
+        self.assertEqual(fragments.get_list_version(1),
+                         fragments.get_list_version(1))
+
+    def test_bump_changes_version(self):
+        before = fragments.get_list_version(1)
+        fragments.bump_list_version(1)
+        self.assertGreater(fragments.get_list_version(1), before)
+
+    def test_bump_without_counter_creates_one(self):
+        fragments.bump_list_version(1)
+        self.assertIsNotNone(fragments.get_list_version(1))
+
+    def test_versions_are_per_list(self):
+        list2_version = fragments.get_list_version(2)
+        fragments.bump_list_version(1)
+        self.assertEqual(fragments.get_list_version(2), list2_version)
+
+    def test_item_table_key_changes_with_version(self):
+        key = fragments.item_table_key(1)
+        fragments.bump_list_version(1)
+        self.assertNotEqual(fragments.item_table_key(1), key)
+
+    def test_item_table_key_depends_on_page(self):
+        self.assertNotEqual(fragments.item_table_key(1),
+                            fragments.item_table_key(1, after=10))
+        self.assertNotEqual(fragments.item_table_key(1, after=10, offset=3),
+                            fragments.item_table_key(1, after=10))
+
+
+# (TransactionTestCase, as TestCase's transaction never commits)
+class BumpOnCommitTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_in_transaction_bumps_again_on_commit(self):
+        with transaction.atomic():
+            fragments.bump_list_version(1)
+            # (e.g., another request caching the old items now)
+            during = fragments.get_list_version(1)
+
+        self.assertGreater(fragments.get_list_version(1), during)
+
+    def test_bump_outside_transaction_bumps_once(self):
+        before = fragments.get_list_version(1)
+        fragments.bump_list_version(1)
+        self.assertEqual(fragments.get_list_version(1), before + 1)
+
+    def test_adding_items_bumps_again_on_commit(self):
+        list_ = List.objects.create()
+        with transaction.atomic():
+            list_.add_items(['foo', 'bar'])
+            during = fragments.get_list_version(list_.id)
+
+        self.assertGreater(fragments.get_list_version(list_.id), during)
+
+
+@patch('lists.models.fragments.bump_list_version')
+class ListWritesBumpVersionTest(TestCase):
+
+    def test_creating_list_bumps_version(self, mock_bump):
+        list_ = List.objects.create()
+        mock_bump.assert_called_with(list_.id)
+
+    def test_create_new_bumps_version(self, mock_bump):
+        list_ = List.create_new(first_item_text='foo')
+        mock_bump.assert_called_with(list_.id)
+
+    def test_existing_list_item_form_save_bumps_version(self, mock_bump):
+        list_ = List.objects.create()
+        mock_bump.reset_mock()
+        form = ExistingListItemForm(for_list=list_, data={'text': 'foo'})
+        form.is_valid()
+
+        form.save()
+
+        mock_bump.assert_called_once_with(list_.id)
+
+    def test_share_bumps_version(self, mock_bump):
+        list_ = List.objects.create()
+        mock_bump.reset_mock()
+
+        list_.share('a@b.com')
+
+        mock_bump.assert_called_once_with(list_.id)
+
+    def test_deleting_item_bumps_version(self, mock_bump):
+        list_ = List.objects.create()
+        item = Item.objects.create(list=list_, text='foo')
+        mock_bump.reset_mock()
+
+        item.delete()
+
+        mock_bump.assert_called_once_with(list_.id)
@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+from lists.models import Item, List, ListSharee
+
+
+class ImportListsTest(TestCase):
+
+    def import_file(self, content, suffix='.ndjson', **options):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        out = StringIO()
+        call_command('import_lists', path, stdout=out, **options)
+        return out.getvalue()
+
+    def ndjson(self, *rows):
+        return ''.join(json.dumps(row) + '\n' for row in rows)
+
+    def test_imports_lists_items_and_sharees(self):
+        output = self.import_file(self.ndjson(
+            {'list': 'a', 'owner': 'owner@b.com', 'item': 'first'},
+            {'list': 'a', 'item': 'second'},
+            {'list': 'a', 'sharee': 'friend@b.com'},
+            {'list': 'b', 'item': 'other list'},
+        ))
+
+        self.assertEqual(List.objects.count(), 2)
+        list_a, list_b = List.objects.order_by('id')
+        self.assertEqual(list_a.owner, User.objects.get(email='owner@b.com'))
+        self.assertEqual(list_a.name, 'first')
+        self.assertEqual(
+            list(list_a.item_set.values_list('text', flat=True)),
+            ['first', 'second']
+        )
+        self.assertEqual(
+            list(list_a.sharees.values_list('email', flat=True)),
+            ['friend@b.com']
+        )
+        self.assertIsNone(list_b.owner)
+        self.assertEqual(list_b.name, 'other list')
+        self.assertIn('Imported 2 lists, 3 items and 1 sharees', output)
+        self.assertIn('items/s', output)
+
+    def test_imports_csv(self):
+        self.import_file(
+            'list,owner,item\n'
+            '1,a@b.com,"first, with comma"\n'
+            '1,a@b.com,second\n',
+            suffix='.csv'
+        )
+
+        list_ = List.objects.get()
+        self.assertEqual(list_.owner_id, 'a@b.com')
+        self.assertEqual(
+            list(list_.item_set.values_list('text', flat=True)),
+            ['first, with comma', 'second']
+        )
+
+    def test_skips_duplicates_across_batches(self):
+        self.import_file(self.ndjson(
+            {'list': 'a', 'item': 'x'},
+            {'list': 'a', 'item': 'y'},
+            {'list': 'a', 'item': 'x'},
+            {'list': 'a', 'sharee': 'f@b.com'},
+            {'list': 'a', 'sharee': 'f@b.com'},
+        ), batch_size=2)
+
+        self.assertEqual(Item.objects.count(), 2)
+        self.assertEqual(ListSharee.objects.count(), 1)
+
+    def test_names_list_whose_first_row_has_no_item(self):
+        self.import_file(self.ndjson(
+            {'list': 'a', 'sharee': 'f@b.com'},
+            {'list': 'a', 'item': 'first'},
+        ), batch_size=1)
+
+        self.assertEqual(List.objects.get().name, 'first')
+
+    def test_uses_existing_users(self):
+        User.objects.create(email='a@b.com')
+
+        self.import_file(self.ndjson({'list': 'a', 'owner': 'a@b.com'}))
+
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(List.objects.get().owner_id, 'a@b.com')
+
+    def test_round_trips_an_export(self):
+        owner = User.objects.create(email='a@b.com')
+        list_ = List.create_new(first_item_text='first', owner=owner)
+        list_.add_items(['second'])
+        response = self.client.get('/lists/users/a@b.com/export/')
+        exported = b''.join(response.streaming_content).decode()
+
+        self.import_file(exported)
+
+        self.assertEqual(List.objects.count(), 2)
+        self.assertEqual(
+            list(List.objects.last().item_set.values_list('text', flat=True)),
+            ['first', 'second']
+        )
+
+    def test_rejects_invalid_email(self):
+        with self.assertRaises(CommandError):
+            self.import_file(self.ndjson({'list': 'a', 'owner': 'nope'}))
+
+    def test_rejects_row_without_list(self):
+        with self.assertRaises(CommandError):
+            self.import_file(self.ndjson({'item': 'x'}))
@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -106,6 +109,62 @@ class ListModelTest(TestCase):
             List.objects.first()
         )
 
+    def test_create_new_is_atomic(self):
+        with patch('lists.models.Item.objects.create',
+                   side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                List.create_new(first_item_text='new item text')
+
+        self.assertEqual(List.objects.count(), 0)
+
+    def test_create_many_creates_lists_with_first_items(self):
+        user = User.objects.create(email='alice@example.com')
+
+        lists = List.create_many(['one', 'two', 'three'], owner=user)
+
+        self.assertEqual([list_.name for list_ in lists],
+                         ['one', 'two', 'three'])
+        self.assertEqual(
+            list(Item.objects.values_list('list_id', 'text')),
+            [(list_.id, list_.name) for list_ in lists]
+        )
+        self.assertEqual({list_.owner for list_ in List.objects.all()},
+                         {user})
+
+    def test_create_many_is_atomic(self):
+        with patch('lists.models.Item.objects.bulk_create',
+                   side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                List.create_many(['one', 'two'])
+
+        self.assertEqual(List.objects.count(), 0)
+
+    def test_create_many_with_nothing(self):
+        self.assertEqual(List.create_many([]), [])
+
+    def test_adding_items_marks_list_modified(self):
+        list_ = List.create_new(first_item_text='first')
+        before = List.objects.get(id=list_.id).modified
+
+        Item.objects.create(list=list_, text='second')
+        after_item = List.objects.get(id=list_.id).modified
+        list_.add_items(['third'])
+        after_items = List.objects.get(id=list_.id).modified
+
+        self.assertLess(before, after_item)
+        self.assertLess(after_item, after_items)
+
+    def test_sharing_marks_list_modified_once(self):
+        list_ = List.create_new(first_item_text='first')
+        before = List.objects.get(id=list_.id).modified
+
+        list_.share('friend@example.com')
+        after_share = List.objects.get(id=list_.id).modified
+        list_.share('friend@example.com')  # (already shared)
+
+        self.assertLess(before, after_share)
+        self.assertEqual(List.objects.get(id=list_.id).modified, after_share)
+
     def test_list_can_have_owner(self):
         List(owner=User())  # should not raise
 
@@ -120,6 +179,111 @@ class ListModelTest(TestCase):
 
         self.assertEqual(list_.name, 'first item')
 
+    def test_list_name_is_stored_on_list_row(self):
+        list_ = List.create_new(first_item_text='first item')
+        Item.objects.create(list=list_, text='second item')
+
+        self.assertEqual(
+            List.objects.get(id=list_.id).first_item_text,
+            'first item'
+        )
+
+    def test_list_name_reading_does_not_query_items(self):
+        List.create_new(first_item_text='first item')
+        list_ = List.objects.first()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list_.name, 'first item')
+
+    def test_empty_list_name(self):
+        list_ = List.objects.create()
+        self.assertEqual(list_.name, 'Empty List')
+
+    def test_deleting_first_item_renames_list(self):
+        list_ = List.objects.create()
+        first = Item.objects.create(list=list_, text='first item')
+        Item.objects.create(list=list_, text='second item')
+
+        first.delete()
+
+        self.assertEqual(list_.name, 'second item')
+        self.assertEqual(List.objects.get(id=list_.id).name, 'second item')
+
+    def test_deleting_only_item_empties_list_name(self):
+        list_ = List.create_new(first_item_text='only item')
+
+        list_.item_set.first().delete()
+
+        self.assertEqual(List.objects.get(id=list_.id).name, 'Empty List')
+
+    def test_sync_names_recomputes_names_in_bulk(self):
+        list1 = List.create_new(first_item_text='list 1')
+        list2 = List.create_new(first_item_text='list 2')
+        Item.objects.create(list=list2, text='list 2, item 2')
+        # QuerySet.delete() doesn't call Item.delete()
+        Item.objects.filter(text__in=['list 1', 'list 2']).delete()
+
+        List.objects.all().sync_names()
+
+        self.assertEqual(List.objects.get(id=list1.id).name, 'Empty List')
+        self.assertEqual(List.objects.get(id=list2.id).name,
+                         'list 2, item 2')
+
+    def test_for_user_finds_owned_and_shared_lists(self):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        owned = List.create_new(first_item_text='mine', owner=owner)
+        shared = List.create_new(first_item_text='theirs', owner=other)
+        shared.share('a@b.com')
+        List.create_new(first_item_text='not mine', owner=other)
+
+        lists = List.objects.for_user('a@b.com').order_by('id')
+
+        self.assertEqual(list(lists), [owned, shared])
+        self.assertEqual([l.is_shared for l in lists], [False, True])
+
+    def test_owned_or_shared_with_finds_the_same_lists_unannotated(self):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        owned = List.create_new(first_item_text='mine', owner=owner)
+        shared = List.create_new(first_item_text='theirs', owner=other)
+        shared.share('a@b.com')
+        List.create_new(first_item_text='not mine', owner=other)
+
+        lists = List.objects.owned_or_shared_with('a@b.com').order_by('id')
+
+        self.assertEqual(list(lists), [owned, shared])
+        self.assertFalse(hasattr(lists[0], 'is_shared'))
+
+    def test_with_summaries_annotates_item_count_and_owner_email(self):
+        owner = User.objects.create(email='a@b.com')
+        list_ = List.create_new(first_item_text='one', owner=owner)
+        Item.objects.create(list=list_, text='two')
+        List.objects.create()
+
+        summaries = List.objects.with_summaries().order_by('id')
+
+        self.assertEqual([l.item_count for l in summaries], [2, 0])
+        self.assertEqual([l.owner_email for l in summaries], ['a@b.com', None])
+
+    def test_add_items_adds_items_in_order(self):
+        list_ = List.create_new(first_item_text='first')
+
+        list_.add_items(['second', 'third'])
+
+        self.assertEqual(
+            list(list_.item_set.values_list('text', flat=True)),
+            ['first', 'second', 'third']
+        )
+
+    def test_add_items_names_empty_list(self):
+        list_ = List.objects.create()
+
+        list_.add_items(['first', 'second'])
+
+        self.assertEqual(list_.name, 'first')
+        self.assertEqual(List.objects.get(id=list_.id).name, 'first')
+
     def test_list_can_be_shared(self):
         list_ = List.objects.create()
         sharee = 'sharee@e.com'
@@ -0,0 +1,86 @@
+import re
+
+from django.db import connection
+from django.db.models import Count, Max
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+from lists.models import List, ListSharee
+from lists.pagination import keyset_page
+
+
+class QueryPlanTest(TestCase):
+    """The hot lookups should be index searches: these fail if one of
+    them regresses to scanning a whole table (e.g., because an index was
+    dropped). The plans checked are SQLite's (EXPLAIN QUERY PLAN output
+    differs between DBs, and other DBs may reasonably prefer a scan on
+    tables as small as the test DB's).
+    """
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks SQLite query plans')
+
+    def assertNoTableScan(self, queryset, allow_sort=False):
+        self.assertPlanHasNoTableScan(queryset.explain(), allow_sort)
+
+    def assertPlanHasNoTableScan(self, plan, allow_sort=False):
+        # (older SQLite versions say `SCAN TABLE items`, newer ones `SCAN
+        # items`)
+        self.assertNotRegex(plan, re.compile(r'\bSCAN\b'))
+        if not allow_sort:
+            self.assertNotIn('TEMP B-TREE', plan)  # i.e., sorting the rows
+        self.assertIn('SEARCH', plan)
+
+    def assertQueriesDontScan(self, run_queries, allow_sort=False):
+        """Check the plan of each query `run_queries()` runs (for
+        querysets that are evaluated straight away, like aggregates).
+        """
+        with CaptureQueriesContext(connection) as queries:
+            run_queries()
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            self.assertPlanHasNoTableScan(plan, allow_sort)
+
+    def test_lists_for_user(self):
+        self.assertNoTableScan(List.objects.for_user('alice@example.com'))
+
+    def test_page_of_my_lists(self):
+        # (as fetched by lists.views.my_lists; the user's lists come from
+        # two indexes, so they do need sorting, but only they do)
+        lists = List.objects.for_user('alice@example.com').with_summaries()
+        self.assertQueriesDontScan(
+            lambda: keyset_page(lists, None, 100), allow_sort=True
+        )
+        self.assertQueriesDontScan(
+            lambda: keyset_page(lists, 100, 100), allow_sort=True
+        )
+
+    def test_my_lists_state(self):
+        # (the My Lists page's ETag; see lists.views._my_lists_state)
+        lists = List.objects.owned_or_shared_with('alice@example.com')
+        self.assertQueriesDontScan(
+            lambda: lists.aggregate(modified=Max('modified'),
+                                    count=Count('id'))
+        )
+
+    def test_sharee_user(self):
+        # (ListSharee.user, and ListShareeQuerySet.with_accounts)
+        self.assertNoTableScan(User.objects.filter(email='alice@example.com'))
+        self.assertNoTableScan(
+            ListSharee.objects.filter(todolist_id=1).with_accounts()
+        )
+
+    def test_list_items_in_order(self):
+        list_ = List.objects.create()
+        self.assertNoTableScan(list_.item_set.all())
+
+    def test_page_of_list_items(self):
+        list_ = List.objects.create()
+        queryset = list_.item_set.filter(id__gt=100)[:101]
+        self.assertNoTableScan(queryset)
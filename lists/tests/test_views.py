@@ -1,8 +1,9 @@
 import unittest
 from unittest.mock import patch, Mock
 
+from django.core.cache import cache
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.html import escape
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -161,6 +162,149 @@ class ListViewTest(TestCase):
         self.assertIsInstance(response.context['form'], ExistingListItemForm)
         self.assertContains(response, 'name="text"')
 
+    def test_passes_sharees_with_account_flags_to_template(self):
+        list_ = List.objects.create()
+        User.objects.create(email='has@account.com')
+        list_.share('has@account.com')
+        list_.share('no@account.com')
+
+        response = self.client.get(f'/lists/{list_.id}/')
+
+        self.assertEqual(
+            [(s.email, s.has_account) for s in response.context['sharees']],
+            [('has@account.com', True), ('no@account.com', False)]
+        )
+        self.assertContains(
+            response,
+            '<li class="list-sharee"><a href="#">has@account.com</a></li>',
+            html=True
+        )
+        self.assertContains(
+            response,
+            '<li class="list-sharee">no@account.com</li>',
+            html=True
+        )
+
+    def test_sharees_cost_one_query_however_many_there_are(self):
+        list_ = List.objects.create()
+        list_.share('sharee@example.com')
+        self.client.get(f'/lists/{list_.id}/')  # cache the item table
+        with self.assertNumQueries(2):
+            self.client.get(f'/lists/{list_.id}/')
+
+        for i in range(200):
+            list_.share(f'sharee{i}@example.com')
+            if i % 2:
+                User.objects.create(email=f'sharee{i}@example.com')
+        self.client.get(f'/lists/{list_.id}/')
+
+        with self.assertNumQueries(2):
+            self.client.get(f'/lists/{list_.id}/')
+
+    # (with sessions cached, so that only the view's own queries count)
+    @override_settings(
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db'
+    )
+    def test_page_uses_fixed_number_of_queries(self):
+        owner = User.objects.create(email='owner@example.com')
+        list_ = List.create_new(first_item_text='item 0', owner=owner)
+        list_.add_items(f'item {i}' for i in range(1, 300))
+        for i in range(20):
+            list_.share(f'sharee{i}@example.com')
+            if i % 2:
+                User.objects.create(email=f'sharee{i}@example.com')
+        self.client.force_login(owner)
+        url = f'/lists/{list_.id}/'
+        cache.clear()
+        self.client.get('/')  # (cache the logged-in user and session)
+
+        # the list and its owner, the sharees, and the page of items
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, 'owner@example.com')
+        self.assertContains(response, 'sharee19@example.com')
+
+        # and once the item table's cached, just the first two
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        # later pages too, however deep (the link says how many items
+        # come before the page, for numbering, rather than us counting)
+        after = list_.item_set.all()[199].id
+        with self.assertNumQueries(3):
+            response = self.client.get(f'{url}?after={after}&n=200')
+        self.assertContains(response, '201: item 200')
+
+    def test_repeat_views_use_cached_item_table(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='item 1')
+        self.client.get(f'/lists/{list_.id}/')
+
+        with patch('lists.views.render_to_string') as mock_render:
+            with self.assertNumQueries(2):  # the list, and its sharees
+                response = self.client.get(f'/lists/{list_.id}/')
+
+        self.assertFalse(mock_render.called)
+        self.assertContains(response, '1: item 1')
+
+    def test_adding_item_invalidates_cached_item_table(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='item 1')
+        self.client.get(f'/lists/{list_.id}/')
+
+        self.client.post(f'/lists/{list_.id}/', data={'text': 'item 2'})
+        response = self.client.get(f'/lists/{list_.id}/')
+
+        self.assertContains(response, '2: item 2')
+
+    @patch('lists.views.ITEMS_PER_PAGE', 2)
+    def test_paginates_items_with_keyset_cursor(self):
+        list_ = List.objects.create()
+        items = [Item.objects.create(list=list_, text=f'item {i}')
+                 for i in range(1, 6)]
+
+        response = self.client.get(f'/lists/{list_.id}/')
+        self.assertEqual(response.context['items'], items[:2])
+        self.assertEqual(response.context['next_after'], items[1].id)
+        self.assertContains(response, f'?after={items[1].id}&amp;n=2')
+
+        response = self.client.get(
+            f'/lists/{list_.id}/?after={items[1].id}&n=2'
+        )
+        self.assertEqual(response.context['items'], items[2:4])
+        self.assertContains(response, '3: item 3')
+        self.assertContains(response, '4: item 4')
+        self.assertContains(response, f'?after={items[3].id}&amp;n=4')
+
+        response = self.client.get(
+            f'/lists/{list_.id}/?after={items[3].id}&n=4'
+        )
+        self.assertEqual(response.context['items'], items[4:])
+        self.assertIsNone(response.context['next_after'])
+        self.assertNotContains(response, 'Next page')
+
+    @patch('lists.views.ITEMS_PER_PAGE', 2)
+    def test_later_page_without_item_count_is_not_numbered(self):
+        list_ = List.objects.create()
+        items = [Item.objects.create(list=list_, text=f'item {i}')
+                 for i in range(1, 6)]
+
+        for query in ('', '&n=nonsense', '&n=-1'):
+            response = self.client.get(
+                f'/lists/{list_.id}/?after={items[1].id}{query}'
+            )
+            self.assertContains(response, '<td>item 3</td>', html=True)
+            self.assertNotContains(response, '3: item 3')
+            self.assertContains(response, f'?after={items[3].id}"')
+
+    def test_ignores_malformed_cursor(self):
+        list_ = List.objects.create()
+        Item.objects.create(list=list_, text='item 1')
+
+        response = self.client.get(f'/lists/{list_.id}/?after=nonsense')
+
+        self.assertContains(response, '1: item 1')
+
 
 # note the distinction between 'integrated' test and 'integration test'
 #
@@ -324,6 +468,180 @@ class MyListsTests(TestCase):
 
         self.assertEqual(response.context['owner'], correct_user)
 
+    def test_passes_owned_and_shared_lists_to_template(self):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        owned_list = List.create_new(first_item_text='mine', owner=owner)
+        shared_list = List.create_new(first_item_text='theirs', owner=other)
+        shared_list.share('a@b.com')
+        List.create_new(first_item_text='not mine', owner=other)
+
+        response = self.client.get('/lists/users/a@b.com/')
+
+        self.assertEqual(response.context['owned_lists'], [owned_list])
+        self.assertEqual(response.context['shared_lists'], [shared_list])
+
+    def test_shows_item_counts_and_owner_emails(self):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        list_ = List.create_new(first_item_text='theirs', owner=other)
+        Item.objects.create(list=list_, text='second item')
+        list_.share('a@b.com')
+
+        response = self.client.get('/lists/users/a@b.com/')
+
+        self.assertContains(response, '2 items, from other@b.com')
+
+    @patch('lists.views.LISTS_PER_PAGE', 2)
+    def test_paginates_lists_with_keyset_cursor(self):
+        owner = User.objects.create(email='a@b.com')
+        lists = [List.create_new(first_item_text=f'list {i}', owner=owner)
+                 for i in range(3)]
+
+        response = self.client.get('/lists/users/a@b.com/')
+        self.assertEqual(response.context['owned_lists'], lists[:2])
+
+        response = self.client.get(
+            f'/lists/users/a@b.com/?after={response.context["next_after"]}'
+        )
+        self.assertEqual(response.context['owned_lists'], lists[2:])
+        self.assertIsNone(response.context['next_after'])
+
+    def assert_constant_queries_for_list_count(self, list_count):
+        owner = User.objects.create(email='a@b.com')
+        other = User.objects.create(email='other@b.com')
+        List.objects.bulk_create(
+            List(owner=owner, first_item_text=f'list {i}')
+            for i in range(list_count)
+        )
+        shared_list = List.create_new(first_item_text='shared', owner=other)
+        shared_list.share('a@b.com')
+
+        # (the user, the lists' ETag/Last-Modified aggregate and the page
+        # of lists)
+        with self.assertNumQueries(3):
+            response = self.client.get('/lists/users/a@b.com/')
+
+        self.assertContains(response, f'list {min(list_count, 100) - 1}')
+
+    def test_constant_queries_with_1_list(self):
+        self.assert_constant_queries_for_list_count(1)
+
+    def test_constant_queries_with_100_lists(self):
+        self.assert_constant_queries_for_list_count(100)
+
+    def test_constant_queries_with_10000_lists(self):
+        self.assert_constant_queries_for_list_count(10000)
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(email='owner@example.com')
+        self.list_ = List.create_new(first_item_text='item 1',
+                                     owner=self.owner)
+        self.list_url = f'/lists/{self.list_.id}/'
+        self.my_lists_url = f'/lists/users/{self.owner.email}/'
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_list_page_has_validators(self):
+        response = self.client.get(self.list_url)
+
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_unchanged_list_is_not_modified_after_one_query(self):
+        response = self.client.get(self.list_url)
+
+        with patch('lists.views.render') as mock_render:
+            with self.assertNumQueries(1):
+                second = self.revalidate(self.list_url, response)
+
+        self.assertEqual(second.status_code, 304)
+        self.assertFalse(mock_render.called)
+
+    def test_also_answers_if_modified_since(self):
+        response = self.client.get(self.list_url)
+
+        second = self.client.get(
+            self.list_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_adding_an_item_changes_the_etag(self):
+        response = self.client.get(self.list_url)
+
+        self.client.post(self.list_url, data={'text': 'item 2'})
+
+        second = self.revalidate(self.list_url, response)
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, 'item 2')
+
+    def test_sharing_changes_the_etag(self):
+        response = self.client.get(self.list_url)
+
+        self.client.post(f'{self.list_url}share',
+                         data={'sharee': 'friend@example.com'})
+
+        self.assertEqual(self.revalidate(self.list_url, response).status_code,
+                         200)
+
+    def test_etag_depends_on_viewer_and_page(self):
+        anonymous = self.client.get(self.list_url)
+        self.client.force_login(self.owner)
+        logged_in = self.client.get(self.list_url)
+        later_page = self.client.get(f'{self.list_url}?after=1')
+        numbered = self.client.get(f'{self.list_url}?after=1&n=1')
+
+        self.assertEqual(
+            len({anonymous['ETag'], logged_in['ETag'], later_page['ETag'],
+                 numbered['ETag']}),
+            4
+        )
+
+    def test_POSTs_are_processed_as_before(self):
+        response = self.client.get(self.list_url)
+
+        second = self.client.post(self.list_url,
+                                  data={'text': 'item 2'},
+                                  HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(second.status_code, 302)
+        self.assertFalse(second.has_header('ETag'))
+        self.assertEqual(self.list_.item_set.count(), 2)
+
+    def test_unchanged_my_lists_is_not_modified_after_one_query(self):
+        response = self.client.get(self.my_lists_url)
+
+        with self.assertNumQueries(1):
+            second = self.revalidate(self.my_lists_url, response)
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_my_lists_changes_when_any_of_the_lists_do(self):
+        other_list = List.create_new(first_item_text='other')
+        other_list.share(self.owner.email)
+        response = self.client.get(self.my_lists_url)
+
+        # an item added to a list that's shared with us
+        other_list.add_items(['another'])
+        self.assertEqual(
+            self.revalidate(self.my_lists_url, response).status_code, 200
+        )
+
+        # a new list
+        response = self.client.get(self.my_lists_url)
+        List.create_new(first_item_text='new', owner=self.owner)
+        self.assertEqual(
+            self.revalidate(self.my_lists_url, response).status_code, 200
+        )
+
 
 class ShareListTests(TestCase):
 
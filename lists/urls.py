@@ -1,5 +1,6 @@
-from django.urls import re_path
+from django.urls import include, re_path
 from . import views
+from .api import urls as api_urls
 
 # Note that with our URLs we are using the following convention:
 # - urls that modify the database ('action' urls): no trailing slash
@@ -7,6 +8,12 @@ from . import views
 urlpatterns = [
     re_path(r'^new$', views.new_list, name='new_list'),
     re_path(r'^(\d+)/$', views.view_list, name='view_list'),
+    re_path(r'^(\d+)/export/$', views.export_list, name='export_list'),
+    # (this has to come before `my_lists`, whose pattern also matches it)
+    re_path(r'^users/(.+)/export/$',
+            views.export_my_lists,
+            name='export_my_lists'),
     re_path(r'^users/(.+)/$', views.my_lists, name='my_lists'),
     re_path(r'^(\d+)/share$', views.share_list, name='share_list'),
+    re_path(r'^api/', include(api_urls)),
 ]
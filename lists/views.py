@@ -1,33 +1,174 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
-from lists.models import Item, List, ListSharee
+from lists import export, fragments
+from lists.pagination import get_cursor, get_offset, keyset_page
+from lists.models import Item, List
 from lists.forms import ItemForm, ExistingListItemForm, NewListForm
 
 
+# (see lists.pagination)
+ITEMS_PER_PAGE = 100
+LISTS_PER_PAGE = 100
+
+
 def home_page(request):
     template = 'lists/home.html'
     context = {'form': ItemForm()}
     return render(request, template, context)
 
+# Conditional GETs
+# ----------------
+# The list pages only change when a list's items or sharees do (which
+# `List.modified` records), so we give them ETag and Last-Modified headers
+# (with `django.views.decorators.http.condition`). A browser (or proxy)
+# that already has the page then gets a 304 Not Modified after a single
+# cheap query (for the list row, or for an aggregate over the user's
+# lists), without us loading the items or rendering anything.
+#
+# The pages also depend on who's looking (e.g., the navbar) and on the
+# page of items/lists, so both go into the ETags. And they're marked
+# `no-cache`, i.e., "check with us before reusing this", as otherwise
+# browsers may guess from Last-Modified that they can reuse the page for a
+# while without asking.
+#
+# (Changes the pages show that don't touch a list, e.g., a sharee signing
+# up, aren't noticed until the list next changes.)
+
+def _etag(request, *parts):
+    viewer = request.user.email if request.user.is_authenticated else ''
+    after = request.GET.get('after', '')
+    offset = request.GET.get('n', '')
+    key = '|'.join(str(part) for part in (*parts, viewer, after, offset))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _is_read(request):
+    # (writes are always processed, and don't need looking anything up)
+    return request.method in ('GET', 'HEAD')
+
+
+def _get_list(request, list_id):
+    # The ETag, the Last-Modified and (if the page has changed) the view
+    # all need the list, so we fetch it just once per request.
+    if not hasattr(request, '_list'):
+        request._list = List.objects.select_related('owner').get(id=list_id)
+    return request._list
+
+
+def _list_modified(request, list_id):
+    if not _is_read(request):
+        return None
+    try:
+        return _get_list(request, list_id).modified
+    except List.DoesNotExist:
+        return None
+
+
+def _list_etag(request, list_id):
+    modified = _list_modified(request, list_id)
+    if modified is None:
+        return None
+    return _etag(request, 'list', list_id, modified.isoformat())
+
+
+def _my_lists_state(request, email):
+    if not _is_read(request):
+        return None
+    if not hasattr(request, '_my_lists_state'):
+        # (the count catches a list disappearing from the page)
+        lists = List.objects.owned_or_shared_with(email)
+        request._my_lists_state = lists.aggregate(
+            modified=Max('modified'),
+            count=Count('id')
+        )
+    return request._my_lists_state
+
+
+def _my_lists_modified(request, email):
+    state = _my_lists_state(request, email)
+    return state and state['modified']
+
+
+def _my_lists_etag(request, email):
+    state = _my_lists_state(request, email)
+    if state is None:
+        return None
+    modified = state['modified'].isoformat() if state['modified'] else ''
+    return _etag(request, 'my_lists', email, modified, state['count'])
+
+
+@cache_control(no_cache=True)
+@condition(etag_func=_list_etag, last_modified_func=_list_modified)
 def view_list(request, list_id):
-    list_ = List.objects.get(id=list_id)
+    # This is the most visited page, so it's kept to a fixed number of
+    # queries: the list (with its owner, which the page shows; see
+    # `_get_list`), the sharees (annotated with whether they have
+    # accounts), and, unless it's cached, the page of items (see
+    # `_render_item_table`).
+    list_ = _get_list(request, list_id)
     form = ExistingListItemForm(for_list=list_)
 
     if request.method == 'POST':
         form = ExistingListItemForm(for_list=list_, data=request.POST)
-        if form.is_valid():
-            form.save()
+        # (duplicates are only found on save, see ExistingListItemForm)
+        if form.is_valid() and form.save() is not None:
             return redirect(list_)
 
+    after = get_cursor(request)
+    offset = 0 if after is None else get_offset(request)
     template = 'lists/list.html'
     context = {'list': list_, 
                'form': form,
+               'item_table': _render_item_table(list_, after, offset),
+               'sharees': list_.sharees.with_accounts(),
     }
     return render(request, template, context)
 
 
+def _render_item_table(list_, after, offset):
+    """Return the rendered item table for the page of `list_` starting
+    after item `after`, from the fragment cache if we can (see
+    lists.fragments). `offset` is the number of items before the page,
+    or None if we don't know it.
+    """
+    key = fragments.item_table_key(list_.id, after, offset)
+    item_table = cache.get(key)
+    if item_table is None:
+        items, next_after = keyset_page(list_.item_set.all(),
+                                        after,
+                                        ITEMS_PER_PAGE)
+        # Items are numbered from the start of the list, not the page. We
+        # don't count the items before the page to find out where that
+        # is (the deeper the page, the longer that would take): the link
+        # to each page says (see lists.pagination). So a page reached
+        # some other way, without it, isn't numbered.
+        next_offset = None
+        if offset is not None and next_after:
+            next_offset = offset + len(items)
+
+        template = 'lists/item_table.html'
+        context = {'items': items,
+                   'item_offset': offset,
+                   'after': after,
+                   'next_after': next_after,
+                   'next_offset': next_offset,
+        }
+        item_table = render_to_string(template, context)
+        cache.set(key, item_table)
+    return mark_safe(item_table)
+
+
 # This will eventually replace `new_list()`
 def new_list(request):
     """Create a new list"""
@@ -40,17 +181,35 @@ def new_list(request):
     return render(request, template, context)
 
 
+@cache_control(no_cache=True)
+@condition(etag_func=_my_lists_etag, last_modified_func=_my_lists_modified)
 def my_lists(request, email):
     owner = User.objects.get(email=email)
 
-    # see https://docs.djangoproject.com/en/2.1/ref/models/querysets/#select-related
-    lists_shared_with_owner = set()
-    for listsharee in ListSharee.objects.filter(email=email).select_related('todolist'):
-        lists_shared_with_owner.add(listsharee.todolist)
+    # We fetch the owned and the shared lists, already annotated with
+    # everything the template shows, in a single query and then split
+    # them up here. That keeps the page at a constant number of queries
+    # however many lists the user has.
+    after = get_cursor(request)
+    lists, next_after = keyset_page(
+        List.objects.for_user(email).with_summaries(),
+        after,
+        LISTS_PER_PAGE
+    )
+    owned_lists = []
+    shared_lists = []
+    for list_ in lists:
+        if list_.owner_id == owner.email:
+            owned_lists.append(list_)
+        if list_.is_shared:
+            shared_lists.append(list_)
 
     template = 'lists/my_lists.html'
     context = {'owner': owner,
-               'shared_lists': lists_shared_with_owner}
+               'owned_lists': owned_lists,
+               'shared_lists': shared_lists,
+               'after': after,
+               'next_after': next_after}
     return render(request, template, context)
 
 
@@ -61,3 +220,34 @@ def share_list(request, list_id):
 
     sharees = list_.sharees
     return redirect(list_)
+
+
+def _export_response(request, items, filename):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in export.EXPORT_FORMATS:
+        return HttpResponseBadRequest(
+            f'Unknown export format: {export_format}'
+        )
+    content_type, content = export.export(items, export_format)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
+def export_list(request, list_id):
+    list_ = List.objects.get(id=list_id)
+    return _export_response(request,
+                            list_.item_set.all(),
+                            f'list-{list_.id}')
+
+
+def export_my_lists(request, email):
+    # everything on the user's My Lists page (i.e., lists they own or that
+    # are shared with them)
+    owner = User.objects.get(email=email)
+    items = Item.objects.filter(
+        list__in=List.objects.owned_or_shared_with(owner.email)
+    )
+    return _export_response(request, items, 'lists')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class SuperlistsConfig(AppConfig):
+    name = 'superlists'
+
+    def ready(self):
+        from superlists.sqlite import apply_pragmas
+        connection_created.connect(apply_pragmas)
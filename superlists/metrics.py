@@ -0,0 +1,139 @@
+"""Per-view request metrics, exposed in the Prometheus text format.
+
+RequestMetricsMiddleware (see superlists.middleware) records each
+request's wall time, number of DB queries and DB time against the name of
+the URL pattern that handled it (e.g., `view_list`). Other code can
+count events of its own with `registry.increment()`. The `metrics` view
+renders it all for Prometheus (or a human with curl) to read.
+
+The aggregates live in the memory of each server process, so with several
+gunicorn workers each scrape sees one worker's numbers. Every series is
+labelled with the worker's pid so that they can be told apart (and summed
+in queries).
+"""
+import os
+import threading
+from collections import defaultdict
+
+from django.http import HttpResponse
+
+
+# upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class _ViewMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.bucket_counts = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(_ViewMetrics)
+        self._events = defaultdict(int)
+
+    def record_request(self, view, seconds, queries, query_seconds):
+        with self._lock:
+            metrics = self._views[view]
+            metrics.requests += 1
+            metrics.seconds += seconds
+            metrics.queries += queries
+            metrics.query_seconds += query_seconds
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    metrics.bucket_counts[index] += 1
+
+    def increment(self, event, amount=1):
+        """Count an occurrence of `event` (e.g., 'login_email_sent')."""
+        with self._lock:
+            self._events[event] += amount
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._events.clear()
+
+    def events(self):
+        with self._lock:
+            return dict(self._events)
+
+    def snapshot(self):
+        """Return a copy of the per-view metrics, as a dict of view name
+        to a dict of their values.
+        """
+        with self._lock:
+            return {
+                view: {
+                    'requests': metrics.requests,
+                    'seconds': metrics.seconds,
+                    'queries': metrics.queries,
+                    'query_seconds': metrics.query_seconds,
+                    'bucket_counts': list(metrics.bucket_counts),
+                }
+                for view, metrics in self._views.items()
+            }
+
+    def render(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        pid = os.getpid()
+        views = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, metric_type, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+        family('superlists_request_duration_seconds', 'histogram',
+               'Request wall time by view.')
+        for view, metrics in views:
+            labels = f'view="{view}",pid="{pid}"'
+            for bound, count in zip(DURATION_BUCKETS,
+                                    metrics['bucket_counts']):
+                lines.append(
+                    'superlists_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(
+                'superlists_request_duration_seconds_bucket'
+                f'{{{labels},le="+Inf"}} {metrics["requests"]}'
+            )
+            lines.append('superlists_request_duration_seconds_sum'
+                         f'{{{labels}}} {metrics["seconds"]}')
+            lines.append('superlists_request_duration_seconds_count'
+                         f'{{{labels}}} {metrics["requests"]}')
+
+        family('superlists_db_queries_total', 'counter',
+               'DB queries by view.')
+        for view, metrics in views:
+            lines.append('superlists_db_queries_total'
+                         f'{{view="{view}",pid="{pid}"}} {metrics["queries"]}')
+
+        family('superlists_db_query_seconds_total', 'counter',
+               'Time spent in DB queries by view.')
+        for view, metrics in views:
+            lines.append('superlists_db_query_seconds_total'
+                         f'{{view="{view}",pid="{pid}"}} '
+                         f'{metrics["query_seconds"]}')
+
+        family('superlists_events_total', 'counter',
+               'Application events, by name.')
+        for event, count in sorted(self.events().items()):
+            lines.append('superlists_events_total'
+                         f'{{event="{event}",pid="{pid}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def metrics(request):
+    return HttpResponse(registry.render(),
+                        content_type='text/plain; version=0.0.4')
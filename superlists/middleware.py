@@ -0,0 +1,71 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from superlists.metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """A DB execute wrapper (see
+    https://docs.djangoproject.com/en/2.1/topics/db/instrumentation/)
+    that counts and times the queries run through it, and keeps their SQL
+    in case the request turns out to be slow.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            self.queries.append((elapsed, sql))
+
+
+class RequestMetricsMiddleware:
+    """Record each request's wall time, DB query count and DB time against
+    its URL name (see superlists.metrics), and log requests slower than
+    settings.SLOW_REQUEST_THRESHOLD_MS along with their SQL.
+
+    This should be the first middleware, so that it also counts the
+    queries the other middleware make (e.g., loading the session).
+    Note that for streaming responses we only see the time taken to start
+    the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unresolved'
+        registry.record_request(view, elapsed, recorder.count,
+                                recorder.seconds)
+
+        if elapsed * 1000 > settings.SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(
+                'Slow request: %s %s (view %s) took %.0fms, '
+                '%d queries in %.0fms:\n%s',
+                request.method, request.path, view, elapsed * 1000,
+                recorder.count, recorder.seconds * 1000,
+                '\n'.join(f'  [{seconds * 1000:.1f}ms] {sql}'
+                          for seconds, sql in recorder.queries)
+            )
+        return response
@@ -53,9 +53,13 @@ INSTALLED_APPS = [
     'lists',
     'accounts',
     'functional_tests',  # needed to make management commands visible
+    'benchmarks',  # (likewise)
+    'superlists',  # (for its signal receivers, see superlists.apps)
 ]
 
 MIDDLEWARE = [
+    # (first, so that it sees the queries made by the other middleware)
+    'superlists.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -89,20 +93,151 @@ WSGI_APPLICATION = 'superlists.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
-DATABASES = {
+#
+# The engine is chosen with the DJANGO_DB_ENGINE environment variable:
+# - `sqlite` (the default): db.sqlite3 in BASE_DIR. Simple, but every write
+#   (new lists, items, shares, tokens) takes a lock on the whole DB, so
+#   gunicorn workers end up taking turns.
+# - `postgresql`: configured with DJANGO_DB_NAME, DJANGO_DB_USER,
+#   DJANGO_DB_PASSWORD, DJANGO_DB_HOST and DJANGO_DB_PORT (and needs
+#   psycopg2, see requirements.txt).
+#
+# DJANGO_DB_CONN_MAX_AGE is how long (in seconds) a worker keeps its DB
+# connection open between requests, rather than connecting for every
+# request (0 means close it after each request; for PostgreSQL it defaults
+# to 60).
+#
+# With DJANGO_DB_POOLED set, we're connecting to a connection pooler (e.g.,
+# pgbouncer in transaction pooling mode) rather than PostgreSQL itself. A
+# pooler may hand each transaction a different server connection, which
+# breaks server-side cursors (used by QuerySet.iterator(), e.g., for
+# exports), so we turn them off.
+DATABASE_ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+DATABASE_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+
+if DATABASE_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': DATABASE_ENGINES['sqlite'],
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 0)),
+            # By default the SQLite test DB is in memory, which can't
+            # handle concurrent writers (so tests that need them are
+            # skipped); set DJANGO_TEST_DB_NAME to a file path to run them.
+            'TEST': {'NAME': os.environ.get('DJANGO_TEST_DB_NAME')},
+        }
+    }
+    # With DJANGO_SQLITE_TUNED set, every new connection runs these (see
+    # superlists.sqlite), so that several workers can write at once with
+    # fewer stalls and "database is locked" errors.
+    SQLITE_TUNED_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000,  # ms
+        'synchronous': 'NORMAL',
+        'mmap_size': 64 * 1024 * 1024,  # bytes
+        'cache_size': -16 * 1024,  # KiB
+    }
+    SQLITE_PRAGMAS = {}
+    if 'DJANGO_SQLITE_TUNED' in os.environ:
+        SQLITE_PRAGMAS = SQLITE_TUNED_PRAGMAS
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DATABASE_ENGINES[DATABASE_ENGINE],
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'superlists'),
+            'USER': os.environ.get('DJANGO_DB_USER', ''),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+            'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 60)),
+            'DISABLE_SERVER_SIDE_CURSORS': 'DJANGO_DB_POOLED' in os.environ,
+            # (the test DB is DJANGO_DB_NAME with a `test_` prefix, and the
+            # DB user needs permission to create it)
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+#
+# The backend is chosen with the DJANGO_CACHE_BACKEND environment variable.
+# `locmem` (the default) keeps the cache in each process's memory, so with
+# several gunicorn workers each worker has its own copy and won't see the
+# others' invalidations. `file` stores it in DJANGO_CACHE_LOCATION, which
+# all the workers on a server share.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': CACHE_BACKENDS[
+            os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')
+        ],
+        'LOCATION': os.environ.get(
+            'DJANGO_CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache')
+        ),
     }
 }
 
 
+# Sessions
+# https://docs.djangoproject.com/en/2.1/topics/http/sessions/#configuring-the-session-engine
+#
+# Chosen with the DJANGO_SESSION_MODE environment variable:
+# - `db` (the default): every request that uses the session reads it from
+#   the DB
+# - `cached_db`: sessions are written to the DB and the cache, and read
+#   from the cache when they're there (so use a cache backend shared by
+#   all the server processes, or a process could keep using a session
+#   another one has logged out of)
+# - `cache`: sessions only live in the cache (so use a shared, persistent
+#   cache backend, and expect logouts if it's cleared)
+# - `signed_cookies`: the session data lives in the (signed, not
+#   encrypted) cookie, so there's no server-side storage at all, but
+#   sessions can't be revoked server-side before they expire
+# The `db` and `cached_db` sessions need cleaning up with `manage.py
+# clearsessions` (see deploy_tools/provisioning_notes.md).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    os.environ.get('DJANGO_SESSION_MODE', 'db')
+]
+
+
 AUTH_USER_MODEL = 'accounts.ListUser'
 
 AUTHENTICATION_BACKENDS = [
     'accounts.authentication.PasswordlessAuthenticationBackend',
 ]
 
+# How long (in seconds) PasswordlessAuthenticationBackend.get_user caches
+# a user for
+USER_CACHE_TTL = 60
+
+# How login link tokens work (see accounts.tokens): 'db' (stored in the
+# DB) or 'signed' (a signed email address and timestamp, so stateless)
+LOGIN_TOKEN_MODE = os.environ.get('LOGIN_TOKEN_MODE', 'db')
+# How long (in seconds) a login link stays valid
+LOGIN_TOKEN_TTL = 60 * 60
+# If we sent a login link to an email address less than this many seconds
+# ago, we don't send another
+LOGIN_TOKEN_REUSE_WINDOW = 2 * 60
+# Login email requests allowed, as (burst capacity, per this many seconds),
+# for each email address and each client IP (see accounts.ratelimit)
+LOGIN_EMAIL_RATE_LIMITS = {
+    'email': (3, 10 * 60),
+    'ip': (20, 10 * 60),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -183,10 +318,19 @@ LOGGING = {
         'django': {
             'handlers': ['console'],
         },
+        'superlists': {
+            'handlers': ['console'],
+        },
     },
     'root': {'level': 'INFO'},
 }
 
+# Requests that take longer than this are logged, with their SQL, by
+# superlists.middleware.RequestMetricsMiddleware
+SLOW_REQUEST_THRESHOLD_MS = int(
+    os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500)
+)
+
 
 # Email
 EMAIL_HOST = 'mail.gandi.net'
@@ -195,3 +339,17 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_PASSWORD')
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 
+# If set (in ms), item additions to the same list arriving within this
+# window of each other are written together, in one transaction (see
+# lists.coalescing). Off by default.
+ITEM_COALESCING_WINDOW = (
+    int(os.environ.get('DJANGO_ITEM_COALESCING_WINDOW_MS', 0)) / 1000
+)
+
+# If set, login emails are queued in the DB and sent by a separate worker
+# (`manage.py send_queued_mail --loop`; see accounts.outbox) instead of
+# during the request.
+LOGIN_EMAIL_QUEUED = 'LOGIN_EMAIL_QUEUED' in os.environ
+# queued emails that fail this many times are no longer retried
+OUTBOX_MAX_ATTEMPTS = 5
+
@@ -0,0 +1,39 @@
+"""Tuning for SQLite, for small deployments that stay on it.
+
+Out of the box, SQLite lets readers block a writer and a writer block
+readers, and a connection that finds the DB locked gives up after
+Python's default 5 second timeout with "database is locked". With several
+gunicorn workers writing at once that shows up as stalls and errors.
+
+When settings.SQLITE_PRAGMAS is set (see DJANGO_SQLITE_TUNED in settings),
+`apply_pragmas` runs them on every new SQLite connection:
+
+- `journal_mode=WAL`: readers no longer block the writer nor the writer
+  the readers (there can still be only one writer at a time). This is
+  stored in the DB file, so it sticks once set. WAL needs all the
+  processes using the DB to be on the same machine (so no network
+  filesystems).
+- `busy_timeout`: how long (in ms) a connection waits for the write lock
+  before giving up.
+- `synchronous=NORMAL`: in WAL mode, only fsync at checkpoints rather than
+  at every commit. A power cut can lose the last few transactions, but
+  can't corrupt the DB.
+- `mmap_size` and `cache_size`: read pages through memory-mapped I/O, and
+  keep more of them cached per connection (a negative `cache_size` is in
+  KiB rather than pages).
+"""
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """A `connection_created` signal receiver (connected in
+    superlists.apps).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
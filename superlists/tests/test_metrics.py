@@ -0,0 +1,76 @@
+from django.test import TestCase
+
+from superlists.metrics import MetricsRegistry, registry
+
+
+class MetricsRegistryTest(TestCase):
+
+    def test_aggregates_requests_by_view(self):
+        metrics = MetricsRegistry()
+
+        metrics.record_request('view_list', 0.2, 3, 0.05)
+        metrics.record_request('view_list', 0.4, 5, 0.15)
+        metrics.record_request('home', 0.01, 0, 0.0)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['view_list']['requests'], 2)
+        self.assertAlmostEqual(snapshot['view_list']['seconds'], 0.6)
+        self.assertEqual(snapshot['view_list']['queries'], 8)
+        self.assertAlmostEqual(snapshot['view_list']['query_seconds'], 0.2)
+        self.assertEqual(snapshot['home']['requests'], 1)
+
+    def test_renders_prometheus_text_format(self):
+        metrics = MetricsRegistry()
+        metrics.record_request('view_list', 0.2, 3, 0.05)
+
+        text = metrics.render()
+
+        self.assertIn('# TYPE superlists_request_duration_seconds histogram',
+                      text)
+        self.assertRegex(
+            text,
+            r'superlists_request_duration_seconds_bucket'
+            r'\{view="view_list",pid="\d+",le="0.1"\} 0'
+        )
+        self.assertRegex(
+            text,
+            r'superlists_request_duration_seconds_bucket'
+            r'\{view="view_list",pid="\d+",le="0.25"\} 1'
+        )
+        self.assertRegex(
+            text,
+            r'superlists_request_duration_seconds_count'
+            r'\{view="view_list",pid="\d+"\} 1'
+        )
+        self.assertRegex(
+            text,
+            r'superlists_db_queries_total\{view="view_list",pid="\d+"\} 3'
+        )
+
+    def test_counts_and_renders_events(self):
+        metrics = MetricsRegistry()
+
+        metrics.increment('login_email_sent')
+        metrics.increment('login_email_sent')
+
+        self.assertEqual(metrics.events(), {'login_email_sent': 2})
+        self.assertRegex(
+            metrics.render(),
+            r'superlists_events_total'
+            r'\{event="login_email_sent",pid="\d+"\} 2'
+        )
+
+
+class MetricsViewTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_serves_metrics_as_text(self):
+        self.client.get('/')
+
+        response = self.client.get('/metrics/')
+
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; version=0.0.4')
+        self.assertContains(response, 'view="home"')
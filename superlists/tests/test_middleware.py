@@ -0,0 +1,49 @@
+from django.test import TestCase, override_settings
+
+from lists.models import List
+from superlists.metrics import registry
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_records_requests_by_url_name(self):
+        list_ = List.create_new(first_item_text='foo')
+
+        self.client.get(f'/lists/{list_.id}/')
+        self.client.get(f'/lists/{list_.id}/')
+
+        self.assertEqual(registry.snapshot()['view_list']['requests'], 2)
+
+    def test_counts_db_queries(self):
+        list_ = List.objects.create()
+
+        with self.assertNumQueries(3):
+            self.client.get(f'/lists/{list_.id}/')
+
+        self.assertEqual(registry.snapshot()['view_list']['queries'], 3)
+        self.assertGreater(
+            registry.snapshot()['view_list']['query_seconds'], 0
+        )
+
+    def test_records_unresolved_urls(self):
+        self.client.get('/no-such-page/')
+        self.assertEqual(registry.snapshot()['unresolved']['requests'], 1)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_logs_slow_requests_with_their_sql(self):
+        list_ = List.objects.create()
+
+        with self.assertLogs('superlists.middleware', 'WARNING') as logs:
+            self.client.get(f'/lists/{list_.id}/')
+
+        self.assertIn('Slow request: GET', logs.output[0])
+        self.assertIn('view_list', logs.output[0])
+        self.assertIn('FROM "lists_list"', logs.output[0])
+
+    def test_does_not_log_fast_requests(self):
+        with self.assertRaises(AssertionError):
+            with self.assertLogs('superlists.middleware', 'WARNING'):
+                self.client.get('/')
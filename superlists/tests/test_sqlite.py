@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import (Client, SimpleTestCase, TransactionTestCase,
+                         override_settings)
+
+from lists.models import Item, List
+
+
+TUNED_PRAGMAS = getattr(settings, 'SQLITE_TUNED_PRAGMAS', {})
+
+
+class ApplyPragmasTest(SimpleTestCase):
+
+    def new_connection(self):
+        # (a connection of our own, to a DB of our own, so that it's
+        # created, and so sends `connection_created`, inside the test)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory.name, 'test.sqlite3'),
+        })
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=TUNED_PRAGMAS)
+    def test_applies_pragmas_to_new_connections(self):
+        wrapper = self.new_connection()
+
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -16 * 1024)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_leaves_connections_alone_by_default(self):
+        wrapper = self.new_connection()
+
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 2)  # FULL
+
+
+# (see accounts.tests.test_authentication.ConcurrentLoginTest for why this
+# needs DJANGO_TEST_DB_NAME)
+class TunedSQLiteStressTest(TransactionTestCase):
+    """Writes from several threads while another connection is in the
+    middle of a read transaction (say, a slow page): with the default
+    rollback journal each write has to wait for the reader to finish, and
+    fails with "database is locked" once it's waited too long; in WAL mode
+    (part of the tuned profile) the writes just go ahead.
+    """
+
+    THREADS = 8
+    LISTS_PER_THREAD = 10
+    ITEMS_PER_LIST = 3
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            self.skipTest('needs a file-based SQLite test DB')
+        # (reconnect, so that this connection gets the pragmas too)
+        connection.close()
+        # Wait less long for a lock before giving up than the default 5s,
+        # to keep the untuned test quick. (The tuned profile's
+        # `busy_timeout` overrides this.)
+        options = patch.dict(connection.settings_dict['OPTIONS'],
+                             {'timeout': 0.2})
+        options.start()
+        self.addCleanup(options.stop)
+
+    def reset_journal_mode(self):
+        # (WAL mode is stored in the DB file, so an earlier tuned test
+        # would leave it switched on)
+        with closing(sqlite3.connect(connection.settings_dict['NAME'])) as db:
+            db.execute('PRAGMA journal_mode=DELETE')
+
+    def write_while_reading(self):
+        """Add lists and items from THREADS threads while a read
+        transaction is open, and return the errors they hit.
+        """
+        reader = sqlite3.connect(connection.settings_dict['NAME'],
+                                 isolation_level=None)
+        self.addCleanup(reader.close)
+        reader.execute('BEGIN')
+        reader.execute('SELECT COUNT(*) FROM lists_list').fetchone()
+
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def write_lists(thread_number):
+            client = Client()
+            try:
+                barrier.wait()
+                for list_number in range(self.LISTS_PER_THREAD):
+                    response = client.post('/lists/new', data={
+                        'text': f'thread {thread_number} list {list_number}'
+                    })
+                    self.assertEqual(response.status_code, 302)
+                    list_url = response['Location']
+                    for item_number in range(self.ITEMS_PER_LIST):
+                        response = client.post(list_url, data={
+                            'text': f'item {item_number}'
+                        })
+                        self.assertEqual(response.status_code, 302)
+                    self.assertEqual(client.get(list_url).status_code, 200)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write_lists, args=(number,))
+                   for number in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reader.execute('COMMIT')
+        return errors
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_untuned_writes_hit_lock_errors(self):
+        self.reset_journal_mode()
+
+        with self.assertLogs('django.request', 'ERROR'):
+            errors = self.write_while_reading()
+
+        self.assertTrue(errors)
+        self.assertTrue(all('database is locked' in str(e) for e in errors))
+
+    @override_settings(SQLITE_PRAGMAS=TUNED_PRAGMAS)
+    def test_tuned_parallel_writes_dont_hit_lock_errors(self):
+        self.reset_journal_mode()
+        # (connecting applies the pragmas, which switch the DB to WAL
+        # mode, before the reader starts)
+        connection.ensure_connection()
+        connection.close()
+
+        errors = self.write_while_reading()
+
+        self.assertEqual(errors, [])
+        lists = self.THREADS * self.LISTS_PER_THREAD
+        self.assertEqual(List.objects.count(), lists)
+        self.assertEqual(Item.objects.count(),
+                         lists * (1 + self.ITEMS_PER_LIST))
@@ -19,6 +19,7 @@ from django.urls import path, re_path, include
 from lists import views as list_views
 from lists import urls as list_urls
 from accounts import urls as accounts_urls
+from superlists import metrics
 
 # Note that with our URLs we are using the following convention:
 # - urls that modify the database ('action' urls): no trailing slash
@@ -28,4 +29,6 @@ urlpatterns = [
     re_path(r'^$', list_views.home_page, name='home'),
     re_path(r'^lists/', include(list_urls)),
     re_path(r'^accounts/', include(accounts_urls)),
+    # (only reachable from the server itself; see nginx.template.conf)
+    re_path(r'^metrics/$', metrics.metrics, name='metrics'),
 ]